@@ -0,0 +1,145 @@
+"""
+Benchmark every (map, problem, algorithm) combination and compare the results with a baseline, e.g.
+
+	python src/benchmark.py run --repetitions 3 --output baseline.json
+	python src/benchmark.py run --repetitions 3 --output results.json
+	python src/benchmark.py compare baseline.json results.json
+
+Each repetition runs in a fresh process, so that its peak RSS is its own. bytes_per_node is the growth of the
+peak RSS during the search divided by the number of generated successors.
+"""
+import argparse
+import json
+import platform
+import resource
+import sys
+from itertools import product
+from multiprocessing import Pool
+from statistics import median
+from typing import Iterable, Optional
+from portfolio import PROBLEMS
+from solve import expand_maps, run_job
+
+
+MAPS = ["cartes/**", "level1", "level2", "level3", "level4", "level5", "level6"]
+# The frontiers compared: Stack, Queue, Heap and Bucket (which only accepts problems with an admissible heuristic)
+ALGORITHMS = ["dfs", "bfs", "astar", "astar_buckets"]
+
+
+def run(
+	maps: Iterable[str] = MAPS,
+	problems: Iterable[str] = PROBLEMS,
+	algorithms: Iterable[str] = ALGORITHMS,
+	repetitions: int = 3,
+	timeout: Optional[float] = 60,
+) -> dict:
+	"""Measure every combination repetitions times, one after the other so that the timings do not compete for cores"""
+	results = []
+	with Pool(processes=1, maxtasksperchild=1) as pool:
+		for map_file, problem, algorithm in product(expand_maps(maps), problems, algorithms):
+			runs = [pool.apply(_measure, (map_file, problem, algorithm, timeout)) for _ in range(repetitions)]
+			results.append(_summarize(runs))
+	return {
+		"python": platform.python_version(),
+		"machine": platform.machine(),
+		"repetitions": repetitions,
+		"timeout": timeout,
+		"results": results,
+	}
+
+
+def _measure(map_file: str, problem: str, algorithm: str, timeout: Optional[float]) -> dict:
+	before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	result = run_job(map_file, problem, algorithm, timeout)
+	# In kilobytes on Linux
+	result["peak_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Growth of the peak RSS during the job per generated successor (stored as a node or dropped as a duplicate)
+	generated = result["successors_generated"]
+	result["bytes_per_node"] = (result["peak_rss"] - before) * 1024 / generated if generated else None
+	return result
+
+
+def _summarize(runs: list[dict]) -> dict:
+	# Searches are deterministic: the repetitions only differ in time and memory
+	first = runs[0]
+	statuses = {run["status"] for run in runs}
+	return {
+		"map": first["map"],
+		"problem": first["problem"],
+		"algorithm": first["algorithm"],
+		"status": first["status"] if len(statuses) == 1 else "unstable",
+		"steps": first["steps"],
+		"nodes_expanded": first["nodes_expanded"],
+		"successors_generated": first["successors_generated"],
+		"times": [run["time"] for run in runs],
+		"time": median(run["time"] for run in runs),
+		"peak_rss": max(run["peak_rss"] for run in runs),
+		"bytes_per_node": max((run["bytes_per_node"] for run in runs if run["bytes_per_node"] is not None), default=None),
+	}
+
+
+def compare(baseline: dict, results: dict, tolerance: float = 0.2, min_time: float = 0.05) -> list[str]:
+	"""
+	The regressions of results against baseline: a combination no longer solved, a longer plan, more expansions,
+	or a median time or peak RSS more than tolerance above the baseline (times under min_time seconds are noise).
+	"""
+	reference = {_key(result): result for result in baseline["results"]}
+	regressions = []
+	for result in results["results"]:
+		before = reference.get(_key(result))
+		if before is None:
+			continue
+		name = "/".join(_key(result))
+		if before["status"] == "solved" and result["status"] != "solved":
+			regressions.append(f"{name}: {result['status']} (was solved)")
+			continue
+		# Only two solved runs are compared, a baseline timeout or error has no steps nor time to compare with
+		if before["status"] != "solved" or result["status"] != "solved":
+			continue
+		for field in ("steps", "nodes_expanded"):
+			if result[field] > before[field]:
+				regressions.append(f"{name}: {field} {before[field]} -> {result[field]}")
+		if result["time"] > max(before["time"], min_time) * (1 + tolerance):
+			regressions.append(f"{name}: time {before['time']:.3f}s -> {result['time']:.3f}s")
+		if result["peak_rss"] > before["peak_rss"] * (1 + tolerance):
+			regressions.append(f"{name}: peak RSS {before['peak_rss']} -> {result['peak_rss']}")
+	return regressions
+
+
+def _key(result: dict) -> tuple[str, str, str]:
+	return result["map"], result["problem"], result["algorithm"]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Benchmark the search algorithms and compare the results with a baseline")
+	commands = parser.add_subparsers(dest="command", required=True)
+	run_parser = commands.add_parser("run", help="run the benchmarks and write the results as JSON")
+	run_parser.add_argument("--maps", nargs="+", default=MAPS, help="map files, glob patterns or lle level names")
+	run_parser.add_argument("--problems", nargs="+", choices=list(PROBLEMS), default=list(PROBLEMS))
+	run_parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS)
+	run_parser.add_argument("--repetitions", type=int, default=3)
+	run_parser.add_argument("--timeout", type=float, default=60, help="time limit of each run in seconds")
+	run_parser.add_argument("--output", required=True)
+	compare_parser = commands.add_parser("compare", help="list the regressions of results against baseline")
+	compare_parser.add_argument("baseline")
+	compare_parser.add_argument("results")
+	compare_parser.add_argument("--tolerance", type=float, default=0.2, help="relative increase of time and memory allowed")
+	args = parser.parse_args(argv)
+
+	if args.command == "run":
+		results = run(args.maps, args.problems, args.algorithms, args.repetitions, args.timeout)
+		with open(args.output, "w") as file:
+			json.dump(results, file, indent=2)
+		return 0
+	with open(args.baseline) as file:
+		baseline = json.load(file)
+	with open(args.results) as file:
+		results = json.load(file)
+	regressions = compare(baseline, results, args.tolerance)
+	for regression in regressions:
+		print(regression)
+	return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
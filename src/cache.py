@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+	"""
+	Mapping bounded to maxsize entries: when full, the least recently used entry is evicted.
+	Hits, misses and evictions are counted to help choosing maxsize.
+	"""
+
+	def __init__(self, maxsize: int):
+		if maxsize < 1:
+			raise ValueError(f"An LRUCache needs room for at least one entry, got maxsize={maxsize}")
+		self.maxsize = maxsize
+		self.entries: OrderedDict[Hashable, V] = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def __len__(self):
+		return len(self.entries)
+
+	def get(self, key: Hashable) -> Optional[V]:
+		"""The value of the key, or None on a miss"""
+		value = self.entries.get(key)
+		if value is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		self.entries.move_to_end(key)
+		return value
+
+	def put(self, key: Hashable, value: V):
+		self.entries[key] = value
+		self.entries.move_to_end(key)
+		if len(self.entries) > self.maxsize:
+			self.entries.popitem(last=False)
+			self.evictions += 1
+
+	@property
+	def hit_rate(self) -> float:
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.0
+
+	def stats(self) -> dict:
+		return {
+			"size": len(self.entries),
+			"maxsize": self.maxsize,
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"hit_rate": self.hit_rate,
+		}
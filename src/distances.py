@@ -0,0 +1,90 @@
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, Tuple
+from lle import World
+
+
+Position = Tuple[int, int]
+INFINITY = float("inf")
+
+
+class DistanceOracle:
+	"""
+	Wall-aware distances on the grid of a World.
+
+	BFS tables are computed once from every exit, gem and corner cell, so that the distance
+	between one of these targets and any cell is a single list lookup. Lasers and exits are
+	considered walkable, which keeps the distances a relaxation of the real problem (and the
+	heuristics built on them admissible).
+	"""
+
+	def __init__(self, height: int, width: int, walls: Iterable[Position], exits: Iterable[Position], targets: Iterable[Position]):
+		self.height = height
+		self.width = width
+		self._walls = frozenset(walls)
+		self._tables: dict[Position, list[float]] = {}
+		self._exits = tuple(exits)
+		for target in (*self._exits, *targets):
+			self._table(target)
+		self._nearest_exit = self._bfs(self._exits)
+
+	@staticmethod
+	def of(world: World) -> "DistanceOracle":
+		"""The oracle of the given world, built only once per map layout"""
+		walls = [*world.wall_pos, *(pos for pos, _ in world.laser_sources)]
+		gems = [pos for pos, _ in world.gems]
+		return _build(world.height, world.width, tuple(sorted(walls)), tuple(world.exit_pos), tuple(gems))
+
+	def layout(self) -> tuple:
+		"""What the distances depend on: the size of the grid, its walls and its exits"""
+		return self.height, self.width, tuple(sorted(self._walls)), self._exits
+
+	def walkable(self, pos: Position) -> bool:
+		return 0 <= pos[0] < self.height and 0 <= pos[1] < self.width and pos not in self._walls
+
+	def distance(self, pos1: Position, pos2: Position) -> float:
+		"""Length of the shortest path between two cells, infinity if there is none"""
+		table = self._tables.get(pos2)
+		if table is None:
+			table = self._tables.get(pos1)
+			if table is None:
+				table = self._table(pos2)
+			else:
+				pos1 = pos2
+		return table[pos1[0] * self.width + pos1[1]]
+
+	def to_nearest_exit(self, pos: Position) -> float:
+		"""Length of the shortest path from the given cell to any exit"""
+		return self._nearest_exit[pos[0] * self.width + pos[1]]
+
+	def _table(self, target: Position) -> list[float]:
+		table = self._tables.get(target)
+		if table is None:
+			table = self._bfs((target,))
+			self._tables[target] = table
+		return table
+
+	def _bfs(self, sources: Iterable[Position]) -> list[float]:
+		table = [INFINITY] * (self.height * self.width)
+		queue = deque()
+		for pos in sources:
+			if self.walkable(pos):
+				table[pos[0] * self.width + pos[1]] = 0
+				queue.append(pos)
+		while queue:
+			i, j = queue.popleft()
+			distance = table[i * self.width + j] + 1
+			for neighbour in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+				if not self.walkable(neighbour):
+					continue
+				index = neighbour[0] * self.width + neighbour[1]
+				if table[index] > distance:
+					table[index] = distance
+					queue.append(neighbour)
+		return table
+
+
+@lru_cache(maxsize=32)
+def _build(height: int, width: int, walls: tuple, exits: tuple, gems: tuple) -> DistanceOracle:
+	corners = ((0, 0), (0, width - 1), (height - 1, 0), (height - 1, width - 1))
+	return DistanceOracle(height, width, walls, exits, (*gems, *corners))
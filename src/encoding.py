@@ -0,0 +1,79 @@
+from copy import copy
+from typing import Iterable, Tuple
+from lle import World, WorldState
+
+
+Position = Tuple[int, int]
+
+
+class StateEncoder:
+	"""
+	Packs a world state into a single int.
+
+	The low bits hold one cell index per agent, followed by one bit per gem (set when collected)
+	and finally the problem specific bits (e.g. the corners already visited). Packed states are
+	cheap to hash and compare, and are decoded back to a WorldState only when needed.
+	"""
+
+	def __init__(self, world: World):
+		self.width = world.width
+		self.height = world.height
+		self.n_agents = world.n_agents
+		self.n_gems = world.n_gems
+		self.cell_bits = max(1, (self.width * self.height - 1).bit_length())
+		self.cell_mask = (1 << self.cell_bits) - 1
+		self.gems_mask = (1 << self.n_gems) - 1
+		self._set_shifts()
+
+	def _set_shifts(self):
+		self.gems_shift = self.cell_bits * self.n_agents
+		self.agents_mask = (1 << self.gems_shift) - 1
+		self.extra_shift = self.gems_shift + self.n_gems
+
+	def restricted(self, n_agents: int) -> "StateEncoder":
+		"""An encoder of the same map for another number of agents (e.g. a subset of them)"""
+		encoder = copy(self)
+		encoder.n_agents = n_agents
+		encoder._set_shifts()
+		return encoder
+
+	def cell(self, pos: Position) -> int:
+		return pos[0] * self.width + pos[1]
+
+	def position(self, cell: int) -> Position:
+		return divmod(cell, self.width)
+
+	def pack(self, cells: Iterable[int], gems: int = 0, extra: int = 0) -> int:
+		"""Pack agent cell indices, a gems bitmask and extra bits into one int"""
+		key = 0
+		for n, cell in enumerate(cells):
+			key |= cell << (n * self.cell_bits)
+		return key | (gems << self.gems_shift) | (extra << self.extra_shift)
+
+	def unpack(self, key: int) -> Tuple[Tuple[int, ...], int, int]:
+		"""Inverse of pack: (agent cells, gems bitmask, extra bits)"""
+		cells = tuple((key >> (n * self.cell_bits)) & self.cell_mask for n in range(self.n_agents))
+		return cells, (key >> self.gems_shift) & self.gems_mask, key >> self.extra_shift
+
+	def encode(self, world_state: WorldState, extra: int = 0) -> int:
+		gems = 0
+		for i, collected in enumerate(world_state.gems_collected):
+			if collected:
+				gems |= 1 << i
+		return self.pack((self.cell(pos) for pos in world_state.agents_positions), gems, extra)
+
+	def decode(self, key: int) -> Tuple[WorldState, int]:
+		"""The world state packed in the given key, along with its extra bits"""
+		cells, gems, extra = self.unpack(key)
+		positions = [self.position(cell) for cell in cells]
+		gems_collected = [bool(gems >> i & 1) for i in range(self.n_gems)]
+		return WorldState(positions, gems_collected), extra
+
+	def agents_positions(self, key: int) -> Tuple[Position, ...]:
+		return tuple(divmod((key >> (n * self.cell_bits)) & self.cell_mask, self.width) for n in range(self.n_agents))
+
+	def gems(self, key: int) -> int:
+		return (key >> self.gems_shift) & self.gems_mask
+
+	def extra(self, key: int) -> int:
+		return key >> self.extra_shift
@@ -0,0 +1,153 @@
+import heapq
+import mmap
+import os
+from array import array
+from tempfile import TemporaryDirectory
+from typing import Iterable, Iterator, Optional
+from problem import SearchProblem
+from search import Solution, pack_action, unpack_action
+
+
+# A record of a layer holds 3 unsigned 64 bits words: the packed state, the row of its parent in the previous layer
+# and its packed joint action. The visited file holds the packed states alone.
+RECORD = 3
+# Number of records read or written at once
+CHUNK = 1 << 14
+# Number of runs merged at once, bounding the open files
+MAX_RUNS = 64
+
+
+def external_bfs(problem: SearchProblem, directory: Optional[str] = None, batch_size: int = 1 << 18) -> Optional[Solution]:
+	"""
+	Breadth-first search with delayed duplicate detection, whose layers and visited states live on disk (in a
+	temporary directory inside the given one) instead of in RAM. Only batch_size generated states are held in memory:
+	each full batch is sorted and written to a run, then the runs of a layer are merged and the states already in
+	the visited file, sorted as well, are dropped in the same linear pass. The plan is rebuilt from the parent rows
+	kept in the layer files. Packed states must fit in 64 bits, ValueError is raised otherwise.
+	"""
+	with TemporaryDirectory(prefix="bfs-", dir=directory) as tmp:
+		n_files = 0
+
+		def new_path() -> str:
+			nonlocal n_files
+			n_files += 1
+			return os.path.join(tmp, str(n_files))
+
+		def plan(row: int, last_actions: list[tuple]) -> Solution:
+			actions = last_actions
+			for layer in reversed(layers[1:]):
+				_, row, code = _record(layer, row, RECORD)
+				actions.append(unpack_action(code, problem.world.n_agents))
+			actions.reverse()
+			return Solution(actions=actions)
+
+		if problem.is_goal_state(problem.initial_state):
+			return Solution(actions=[])
+		start = problem.encode(problem.initial_state)
+		layers = [new_path()]
+		_write(layers[0], [(start, 0, 0)], RECORD)
+		visited = new_path()
+		_write(visited, [(start,)], 1)
+		while True:
+			runs = []
+			batch = []
+			for row, (key, _, _) in enumerate(_read(layers[-1], RECORD)):
+				for state, action, _ in problem.get_successors(problem.decode(key)):
+					if problem.is_goal_state(state):
+						return plan(row, [action])
+					batch.append((problem.encode(state), row, pack_action(action)))
+				if len(batch) >= batch_size:
+					runs.append(_spill(batch, new_path()))
+					batch = []
+			if batch:
+				runs.append(_spill(batch, new_path()))
+			while len(runs) > MAX_RUNS:
+				runs = [_merge(runs[i:i + MAX_RUNS], new_path()) for i in range(0, len(runs), MAX_RUNS)]
+			layer = new_path()
+			candidates = _unique(heapq.merge(*(_read(run, RECORD) for run in runs)))
+			if _write(layer, _subtract(candidates, _read(visited, 1)), RECORD) == 0:
+				return None
+			for run in runs:
+				os.remove(run)
+			layers.append(layer)
+			merged = new_path()
+			_write(merged, heapq.merge(_read(visited, 1), ((key,) for key, _, _ in _read(layer, RECORD))), 1)
+			os.remove(visited)
+			visited = merged
+
+
+def _spill(batch: list[tuple[int, int, int]], path: str) -> str:
+	"""Write the batch, sorted and without duplicate states, to a run"""
+	batch.sort()
+	_write(path, _unique(batch), RECORD)
+	return path
+
+
+def _merge(runs: list[str], path: str) -> str:
+	"""Merge the runs into one, without duplicate states, and remove them"""
+	_write(path, _unique(heapq.merge(*(_read(run, RECORD) for run in runs))), RECORD)
+	for run in runs:
+		os.remove(run)
+	return path
+
+
+def _unique(records: Iterable[tuple[int, ...]]) -> Iterator[tuple[int, ...]]:
+	"""The first record of each state, the records being sorted by state"""
+	previous = None
+	for record in records:
+		if record[0] != previous:
+			previous = record[0]
+			yield record
+
+
+def _subtract(records: Iterable[tuple[int, ...]], visited: Iterator[tuple[int]]) -> Iterator[tuple[int, ...]]:
+	"""The records whose state is not visited, both being sorted by state"""
+	known = next(visited, None)
+	for record in records:
+		while known is not None and known[0] < record[0]:
+			known = next(visited, None)
+		if known is None or known[0] != record[0]:
+			yield record
+
+
+def _write(path: str, records: Iterable[tuple[int, ...]], width: int) -> int:
+	"""Write the records of width words to the file and return their number"""
+	words = array("Q")
+	count = 0
+	with open(path, "wb") as file:
+		for record in records:
+			try:
+				words.extend(record)
+			except OverflowError:
+				raise ValueError("Packed states wider than 64 bits cannot be written to the layer files") from None
+			count += 1
+			if len(words) >= CHUNK * width:
+				words.tofile(file)
+				words = array("Q")
+		words.tofile(file)
+	return count
+
+
+def _read(path: str, width: int) -> Iterator[tuple[int, ...]]:
+	"""The records of width words of the file, in order, read chunk by chunk through a memory map"""
+	if os.path.getsize(path) == 0:
+		return
+	with _map(path) as data:
+		with memoryview(data).cast("Q") as words:
+			for start in range(0, len(words), CHUNK * width):
+				chunk = words[start:start + CHUNK * width].tolist()
+				for i in range(0, len(chunk), width):
+					yield tuple(chunk[i:i + width])
+
+
+def _record(path: str, row: int, width: int) -> tuple[int, ...]:
+	"""The record of the file at the given row"""
+	with _map(path) as data:
+		with memoryview(data).cast("Q") as words:
+			return tuple(words[row * width:(row + 1) * width])
+
+
+def _map(path: str) -> mmap.mmap:
+	"""The file memory-mapped for reading, holding a single file descriptor"""
+	with open(path, "rb") as file:
+		return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
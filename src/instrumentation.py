@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+from problem import override
+
+
+class SearchHooks:
+	"""
+	The events of the search() loop, ignored here: the loop calls the problem directly and pushes the successors
+	of a node at once. SearchMonitor overrides them.
+	"""
+
+	def bind(self, problem) -> tuple[Callable, Callable, Callable]:
+		"""The goal test, successor function and heuristic called by the loop"""
+		return problem.is_goal_state, problem.get_successors, problem.heuristic
+
+	def push_many(self, frontier, nodes: Iterable):
+		frontier.push_many(nodes)
+
+	def pop(self, node):
+		pass
+
+	def expand(self, node, successors: Iterable):
+		pass
+
+	def duplicate(self, node, successor: tuple):
+		pass
+
+	def goal(self, node):
+		pass
+
+
+@dataclass
+class SearchMonitor(SearchHooks):
+	"""
+	Instrumentation of search(): counters filled in during the search, and optional callbacks on its events.
+
+	on_push, on_pop and on_goal receive the node, on_expand the node and its successors as given by
+	get_successors, on_duplicate the node and the successor (state, action, cost) that was pruned.
+	The times are cumulative, in seconds. Without a monitor, search() runs without any of this bookkeeping.
+	"""
+	on_push: Optional[Callable] = None
+	on_pop: Optional[Callable] = None
+	on_expand: Optional[Callable] = None
+	on_duplicate: Optional[Callable] = None
+	on_goal: Optional[Callable] = None
+
+	pushed: int = 0
+	popped: int = 0
+	expanded: int = 0
+	successors_generated: int = 0
+	duplicates: int = 0
+	max_frontier_size: int = 0
+	heuristic_time: float = 0.0
+	successors_time: float = 0.0
+	goal_test_time: float = 0.0
+
+	@override(SearchHooks)
+	def bind(self, problem) -> tuple[Callable, Callable, Callable]:
+		def is_goal_state(state) -> bool:
+			start = perf_counter()
+			is_goal = problem.is_goal_state(state)
+			self.goal_test_time += perf_counter() - start
+			return is_goal
+
+		def get_successors(state) -> list:
+			start = perf_counter()
+			successors = list(problem.get_successors(state))
+			self.successors_time += perf_counter() - start
+			return successors
+
+		def heuristic(state) -> float:
+			start = perf_counter()
+			h = problem.heuristic(state)
+			self.heuristic_time += perf_counter() - start
+			return h
+
+		return is_goal_state, get_successors, heuristic
+
+	@override(SearchHooks)
+	def push_many(self, frontier, nodes: Iterable):
+		for node in nodes:
+			frontier.push(node)
+			self.push(node, len(frontier))
+
+	def push(self, node, frontier_size: int):
+		self.pushed += 1
+		self.max_frontier_size = max(self.max_frontier_size, frontier_size)
+		if self.on_push is not None:
+			self.on_push(node)
+
+	@override(SearchHooks)
+	def pop(self, node):
+		self.popped += 1
+		if self.on_pop is not None:
+			self.on_pop(node)
+
+	@override(SearchHooks)
+	def expand(self, node, successors: list):
+		self.expanded += 1
+		self.successors_generated += len(successors)
+		if self.on_expand is not None:
+			self.on_expand(node, successors)
+
+	@override(SearchHooks)
+	def duplicate(self, node, successor: tuple):
+		self.duplicates += 1
+		if self.on_duplicate is not None:
+			self.on_duplicate(node, successor)
+
+	@override(SearchHooks)
+	def goal(self, node):
+		if self.on_goal is not None:
+			self.on_goal(node)
@@ -1,6 +1,7 @@
 from lle import World
 from problem import SimpleSearchProblem, CornerSearchProblem, GemSearchProblem
 from search import dfs, bfs, astar
+from solution_cache import SolutionCache
 import cv2
 
 from time import time
@@ -72,6 +73,9 @@ maps = [maps[2]]
 algos = [(astar, "astar")]
 #maps = ["cartes/gems"]
 
+# Solutions already found by a previous run are replayed instead of searched again
+cache = SolutionCache()
+
 for map in maps:
 	w = World.from_file(map)
 	print("Carte : " + map)
@@ -82,13 +86,20 @@ for map in maps:
 		for problem, problem_name in problems:
 			problem = problem(w)
 			debut = time()
-			solution = algo(problem)
+			result = cache.solve(map, problem, name, algo)
 			fin = time()
-			if solution is None:
+			if result is None:
 				print(f"{name}: No solution found")
 			else:
+				solution = result.solution
 				print(f"Problem : {problem_name}")
-				print(f"{name}: {len(solution.actions)} actions, {problem.nodes_expanded} nodes expanded en {fin - debut} secondes")
+				if result.hit:
+					print(
+						f"{name}: {len(solution.actions)} actions (cache en {fin - debut} secondes), "
+						f"{result.nodes_expanded} nodes expanded en {result.time} secondes"
+					)
+				else:
+					print(f"{name}: {len(solution.actions)} actions, {problem.nodes_expanded} nodes expanded en {fin - debut} secondes")
 				"""
 				w.reset()
 				for action in solution.actions:
@@ -0,0 +1,233 @@
+import os
+from dataclasses import dataclass
+from heapq import heappush, heappop
+from math import inf
+from multiprocessing import get_context
+from queue import Empty
+from time import sleep, time
+from typing import Optional
+from lle import World
+from portfolio import PROBLEMS
+from search import Solution, pack_action, unpack_action
+
+
+# Nodes expanded by a worker between two looks at its inbox, the states generated for the other workers being sent then
+EXPANSIONS = 64
+
+
+@dataclass
+class ParallelResult:
+	solution: Solution
+	nodes_expanded: int
+	successors_generated: int
+	time: float
+
+
+def hda_star(map_file: str, problem: str = "gems", n_workers: Optional[int] = None, **options) -> Optional[ParallelResult]:
+	"""
+	Hash distributed A* (Kishimoto, Fukunaga and Botea): n_workers processes (one per core by default) each own the
+	states whose hash falls to them, with their own open and closed lists. A generated state is sent to its owner,
+	in batches, which keeps it only if it is reached more cheaply than before. The cost of the best goal found is
+	shared, and nodes whose f is not below it are pruned. A worker whose best node has a higher f than the best node
+	of another worker waits for it instead of expanding nodes A* would not. The search ends when every worker is
+	idle and every sent batch was received, so the solution is optimal when the heuristic is admissible, as with astar.
+
+	Every worker loads the World from map_file and builds the problem with the given options (e.g. native=True).
+	Returns None if there is no solution.
+	"""
+	if problem not in PROBLEMS:
+		raise ValueError(f"Unknown problem: {problem}")
+	n_workers = n_workers or os.cpu_count() or 1
+	context = get_context()
+	inboxes = [context.Queue() for _ in range(n_workers)]
+	replies = context.Queue()
+	incumbent = context.Value("d", inf)
+	# Each worker only writes its own slots. A batch is counted as sent before being put in the inbox, and a worker
+	# is marked busy before counting a batch as received
+	idle = context.Array("b", n_workers, lock=False)
+	sent = context.Array("q", n_workers, lock=False)
+	received = context.Array("q", n_workers, lock=False)
+	# f of the best open node of each worker, infinite when its open list is empty
+	lowest = context.Array("d", [inf] * n_workers, lock=False)
+	workers = [
+		context.Process(
+			target=_work,
+			args=(index, map_file, problem, options, inboxes, replies, incumbent, idle, sent, received, lowest),
+			daemon=True,
+		)
+		for index in range(n_workers)
+	]
+	start = time()
+	for worker in workers:
+		worker.start()
+	try:
+		_wait_termination(workers, idle, sent, received)
+		for inbox in inboxes:
+			inbox.put(("finish",))
+		reports = [_reply(replies, workers) for _ in workers]
+		cost, goal, n_agents, _, _ = min(reports, key=lambda report: report[0])
+		if goal is None:
+			return None
+		actions = []
+		key = goal
+		while True:
+			inboxes[_owner(key, n_workers)].put(("parent", key))
+			parent = _reply(replies, workers)
+			if parent is None:
+				break
+			key, code = parent
+			actions.append(unpack_action(code, n_agents))
+		actions.reverse()
+		return ParallelResult(
+			Solution(actions=actions),
+			sum(report[3] for report in reports),
+			sum(report[4] for report in reports),
+			time() - start,
+		)
+	finally:
+		for inbox in inboxes:
+			inbox.put(None)
+		for worker in workers:
+			worker.join(timeout=1)
+			if worker.is_alive():
+				worker.terminate()
+				worker.join()
+
+
+def _owner(key: int, n_workers: int) -> int:
+	"""The worker owning the state: a multiplicative hash spreads neighbouring states over the workers"""
+	return ((key * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >> 32) % n_workers
+
+
+def _check_alive(workers: list):
+	for index, worker in enumerate(workers):
+		if not worker.is_alive():
+			raise RuntimeError(f"Worker {index} of hda_star died with exit code {worker.exitcode}")
+
+
+def _reply(replies, workers: list):
+	"""The next reply of a worker, raising RuntimeError instead of waiting forever if one of them died"""
+	while True:
+		try:
+			return replies.get(timeout=0.1)
+		except Empty:
+			_check_alive(workers)
+
+
+def _wait_termination(workers: list, idle, sent, received):
+	"""
+	Wait until every worker is idle with no batch in transit. The counters only grow, so two successive reads
+	finding them equal and unchanged, with every worker idle, see a state in which nothing is left to do.
+	"""
+	previous = None
+	while True:
+		_check_alive(workers)
+		snapshot = (all(idle), sum(sent), sum(received))
+		if snapshot[0] and snapshot[1] == snapshot[2]:
+			if snapshot == previous:
+				return
+			previous = snapshot
+		else:
+			previous = None
+		sleep(0.001)
+
+
+def _work(
+	index: int,
+	map_file: str,
+	problem_name: str,
+	options: dict,
+	inboxes: list,
+	replies,
+	incumbent,
+	idle,
+	sent,
+	received,
+	lowest,
+):
+	problem = PROBLEMS[problem_name](World.from_file(map_file), **options)
+	n_workers = len(inboxes)
+	inbox = inboxes[index]
+	# Open list of (f, -g, key), deepest first among ties, best known g and (parent, packed joint action) of the states
+	# owned by this worker
+	open_list = []
+	best = {}
+	parents = {}
+	goal, goal_cost = None, inf
+
+	def add(key: int, g: float, parent: Optional[int], code: int, state=None):
+		"""
+		Open the state unless it is known at a g as low. Only states received from other workers are decoded. A goal
+		is not opened but lowers the incumbent cost at once, so that every worker prunes with it.
+		"""
+		if g >= best.get(key, inf):
+			return
+		best[key] = g
+		parents[key] = None if parent is None else (parent, code)
+		if state is None:
+			state = problem.decode(key)
+		heappush(open_list, (g + problem.heuristic(state), -g, key))
+
+	start = problem.encode(problem.initial_state)
+	if _owner(start, n_workers) == index:
+		add(start, 0, None, 0, problem.initial_state)
+	outboxes = [[] for _ in range(n_workers)]
+	while True:
+		waiting = False
+		for _ in range(EXPANSIONS):
+			bound = incumbent.value
+			# Nodes superseded by a cheaper path or not below the incumbent cost are dropped
+			while open_list and (open_list[0][0] >= bound or -open_list[0][1] > best[open_list[0][2]]):
+				heappop(open_list)
+			if not open_list:
+				break
+			lowest[index] = open_list[0][0]
+			# The worker with the best node always goes on, the others do not run ahead of it
+			if open_list[0][0] > min(lowest):
+				waiting = True
+				break
+			_, g, key = heappop(open_list)
+			g = -g
+			state = problem.decode(key)
+			if problem.is_goal_state(state):
+				with incumbent.get_lock():
+					if g < incumbent.value:
+						incumbent.value = g
+				if g < goal_cost:
+					goal, goal_cost = key, g
+				continue
+			for new_state, action, cost in problem.get_successors(state):
+				new_key = problem.encode(new_state)
+				new_g = g + problem.g(new_state, cost)
+				owner = _owner(new_key, n_workers)
+				if owner == index:
+					add(new_key, new_g, key, pack_action(action), new_state)
+				else:
+					outboxes[owner].append((new_key, new_g, key, pack_action(action)))
+		for owner, batch in enumerate(outboxes):
+			if batch:
+				sent[index] += 1
+				inboxes[owner].put(batch)
+				outboxes[owner] = []
+		if not open_list:
+			lowest[index] = inf
+		# Wait for batches when there is nothing left to expand, or for a while when waiting for other workers,
+		# otherwise only take those already there
+		while True:
+			if not open_list:
+				idle[index] = 1
+			try:
+				message = inbox.get(block=not open_list or waiting, timeout=0.001 if open_list else None)
+			except Empty:
+				break
+			if message is None:
+				return
+			if isinstance(message, list):
+				idle[index] = 0
+				received[index] += 1
+				for record in message:
+					add(*record)
+			elif message[0] == "finish":
+				replies.put((goal_cost, goal, problem.world.n_agents, problem.nodes_expanded, problem.successors_generated))
+			else:
+				replies.put(parents[message[1]])
@@ -0,0 +1,145 @@
+import hashlib
+import mmap
+import os
+from array import array
+from functools import lru_cache
+from itertools import product
+from tempfile import NamedTemporaryFile
+from typing import Sequence, Tuple
+from distances import DistanceOracle
+
+
+Position = Tuple[int, int]
+# Bump when the file layout or the meaning of the values changes, so that stale files are not loaded
+FORMAT = 1
+# Values are stored as unsigned 16 bits, this one standing for an unreachable goal
+UNREACHABLE = 0xFFFF
+# Bounds on the number of entries of a database and on the number of targets in its pattern
+MAX_ENTRIES = 1 << 20
+MAX_PATTERN = 6
+
+
+class PatternDatabase:
+	"""
+	Exact costs of an abstraction of a problem: the agents alone on the grid (no lasers, no collisions) and only
+	a group of its targets (gems or corners), which have to be visited before every agent stands on an exit.
+
+	The values are a flat array indexed by the remaining targets of the group, then by the cell of each agent.
+	They are stored in a file which is memory-mapped on load, so a lookup costs no allocation and processes
+	loading the same file share its pages.
+	"""
+
+	def __init__(self, path: str, n_cells: int, n_agents: int, shift: int, size: int):
+		self.path = path
+		self.n_cells = n_cells
+		self.n_agents = n_agents
+		self.shift = shift
+		self.size = size
+		self._group_mask = (1 << size) - 1
+		with open(path, "rb") as file:
+			self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		self._values = memoryview(self._mmap).cast("H")
+		expected = n_cells**n_agents << size
+		if len(self._values) != expected:
+			raise ValueError(f"{path} holds {len(self._values)} values instead of {expected}")
+
+	def lookup(self, cells: Sequence[int], remaining: int) -> float:
+		"""Cost of the abstraction with the agents on the given cells and the remaining targets of the group"""
+		index = remaining >> self.shift & self._group_mask
+		for cell in cells:
+			index = index * self.n_cells + cell
+		value = self._values[index]
+		return float("inf") if value == UNREACHABLE else value
+
+
+def pattern_size(n_cells: int, n_agents: int, n_targets: int) -> int:
+	"""Number of targets per pattern such that a database holds at most MAX_ENTRIES values, 0 if even one is too many"""
+	size = min(MAX_PATTERN, n_targets)
+	while size > 0 and n_cells**n_agents << size > MAX_ENTRIES:
+		size -= 1
+	return size
+
+
+def load(directory: str, oracle: DistanceOracle, targets: Sequence[Position], n_agents: int) -> list[PatternDatabase]:
+	"""
+	The databases of consecutive groups of targets (target i being bit i of the remaining targets), built and
+	written to the directory on the first call for this layout and memory-mapped afterwards.
+	"""
+	n_cells = oracle.height * oracle.width
+	size = pattern_size(n_cells, n_agents, len(targets))
+	if size == 0:
+		return []
+	os.makedirs(directory, exist_ok=True)
+	databases = []
+	for shift in range(0, len(targets), size):
+		group = tuple(targets[shift:shift + size])
+		digest = hashlib.sha1(repr((FORMAT, oracle.layout(), group, n_agents)).encode()).hexdigest()
+		path = os.path.join(directory, f"{digest}.pdb")
+		if not os.path.exists(path):
+			_write(path, build(oracle, group, n_agents))
+		databases.append(_open(path, n_cells, n_agents, shift, len(group)))
+	return databases
+
+
+def build(oracle: DistanceOracle, targets: Sequence[Position], n_agents: int) -> array:
+	"""
+	Backward search from the goal of the abstraction, one target at a time.
+
+	For a single agent, the cost with no target left is the distance to the nearest exit, and otherwise the
+	best over the next target visited of the distance to it plus the cost from there without it. Several
+	agents share the targets: the cost is the best split of the targets of the makespan of the agents.
+	"""
+	n_cells = oracle.height * oracle.width
+	n_masks = 1 << len(targets)
+	cells = [cell for cell in range(n_cells) if oracle.walkable(divmod(cell, oracle.width))]
+	single = [float("inf")] * (n_masks * n_cells)
+	for cell in cells:
+		single[cell] = oracle.to_nearest_exit(divmod(cell, oracle.width))
+	for mask in range(1, n_masks):
+		for t, target in enumerate(targets):
+			if not mask >> t & 1:
+				continue
+			rest = single[(mask ^ 1 << t) * n_cells + target[0] * oracle.width + target[1]]
+			for cell in cells:
+				cost = oracle.distance(divmod(cell, oracle.width), target) + rest
+				if cost < single[mask * n_cells + cell]:
+					single[mask * n_cells + cell] = cost
+	joint = single
+	for n in range(2, n_agents + 1):
+		joint = _add_agent(single, joint, cells, n_cells, n_masks, n - 1)
+	return array("H", (UNREACHABLE if value >= UNREACHABLE else int(value) for value in joint))
+
+
+def _add_agent(single: list[float], joint: list[float], cells: list[int], n_cells: int, n_masks: int, n_agents: int) -> list[float]:
+	"""The costs with one more agent than in joint, which takes the targets of its best subset"""
+	stride = n_cells**n_agents
+	result = [float("inf")] * (n_masks * n_cells * stride)
+	others = [0]
+	for _ in range(n_agents):
+		others = [index * n_cells + cell for index in others for cell in cells]
+	for mask in range(n_masks):
+		subsets = [mask]
+		subset = mask
+		while subset:
+			subset = (subset - 1) & mask
+			subsets.append(subset)
+		for cell, other in product(cells, others):
+			best = float("inf")
+			for subset in subsets:
+				cost = max(single[subset * n_cells + cell], joint[(mask ^ subset) * stride + other])
+				if cost < best:
+					best = cost
+			result[(mask * n_cells + cell) * stride + other] = best
+	return result
+
+
+def _write(path: str, values: array):
+	"""Written next to its final path then renamed, so that a concurrent reader never sees a partial file"""
+	with NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as file:
+		values.tofile(file)
+	os.replace(file.name, path)
+
+
+@lru_cache(maxsize=32)
+def _open(path: str, n_cells: int, n_agents: int, shift: int, size: int) -> PatternDatabase:
+	return PatternDatabase(path, n_cells, n_agents, shift, size)
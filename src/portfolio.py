@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from multiprocessing import get_context
+from queue import Empty
+from time import time
+from typing import Callable, Iterable, Optional
+from lle import World
+from problem import SearchProblem, SimpleSearchProblem, CornerSearchProblem, GemSearchProblem
+from search import Solution, dfs, bfs, astar, astar_buckets, weighted_astar, pack_action, unpack_action
+
+
+PROBLEMS: dict[str, type[SearchProblem]] = {
+	"simple": SimpleSearchProblem,
+	"corners": CornerSearchProblem,
+	"gems": GemSearchProblem,
+}
+
+ALGORITHMS: dict[str, Callable[[SearchProblem], Optional[Solution]]] = {
+	"dfs": dfs,
+	"bfs": bfs,
+	"astar": astar,
+	"astar_buckets": astar_buckets,
+	"wastar1.5": lambda problem: weighted_astar(problem, 1.5),
+	"wastar2": lambda problem: weighted_astar(problem, 2),
+	"wastar5": lambda problem: weighted_astar(problem, 5),
+}
+
+
+@dataclass
+class PortfolioResult:
+	algorithm: str
+	solution: Solution
+	nodes_expanded: int
+	time: float
+
+
+def solve(
+	map_file: str,
+	problem: str = "simple",
+	algorithms: Iterable[str] = ALGORITHMS,
+	deadline: Optional[float] = None,
+) -> Optional[PortfolioResult]:
+	"""
+	Run every algorithm on the map in its own process, each one loading the World from map_file.
+
+	Without deadline, return the first solution found. With a deadline (in seconds), wait until it expires
+	or every algorithm is done and return the shortest solution. Algorithms still running are terminated.
+	Returns None if no algorithm found a solution in time.
+	"""
+	algorithms = list(algorithms)
+	unknown = [algorithm for algorithm in algorithms if algorithm not in ALGORITHMS] + ([] if problem in PROBLEMS else [problem])
+	if unknown:
+		raise ValueError(f"Unknown problems or algorithms: {unknown}")
+	context = get_context()
+	results = context.Queue()
+	workers = {
+		algorithm: context.Process(target=_run, args=(map_file, problem, algorithm, results), daemon=True) for algorithm in algorithms
+	}
+	for worker in workers.values():
+		worker.start()
+	end = None if deadline is None else time() + deadline
+	best: Optional[PortfolioResult] = None
+	running = set(workers)
+	try:
+		while running:
+			if end is not None and time() >= end:
+				break
+			try:
+				timeout = 0.1 if end is None else max(0, min(0.1, end - time()))
+				algorithm, actions, n_agents, nodes_expanded, duration = results.get(timeout=timeout)
+			except Empty:
+				# A worker that died without reporting (e.g. out of memory) is not waited for
+				running = {algorithm for algorithm in running if workers[algorithm].is_alive() or workers[algorithm].exitcode == 0}
+				continue
+			running.discard(algorithm)
+			if actions is None:
+				continue
+			solution = Solution(actions=[unpack_action(code, n_agents) for code in actions])
+			if best is None or solution.n_steps < best.solution.n_steps:
+				best = PortfolioResult(algorithm, solution, nodes_expanded, duration)
+			if end is None:
+				break
+	finally:
+		for worker in workers.values():
+			if worker.is_alive():
+				worker.terminate()
+			worker.join()
+	return best
+
+
+def _run(map_file: str, problem_name: str, algorithm: str, results):
+	problem = PROBLEMS[problem_name](World.from_file(map_file))
+	start = time()
+	solution = ALGORITHMS[algorithm](problem)
+	duration = time() - start
+	# lle actions are not picklable, so they cross process boundaries packed by pack_action
+	actions = None if solution is None else [pack_action(joint_action) for joint_action in solution.actions]
+	results.put((algorithm, actions, problem.world.n_agents, problem.nodes_expanded, duration))
@@ -1,5 +1,7 @@
 import heapq
-from typing import Generic, TypeVar
+from collections import deque
+from math import floor
+from typing import Generic, Optional, TypeVar
 from typing_extensions import deprecated
 
 T = TypeVar("T")
@@ -28,13 +30,14 @@ class PriorityQueue(Generic[T]):
 		(_, _, item) = heapq.heappop(self.heap)
 		return item
 
-	@deprecated
+	@deprecated("Use is_empty instead")
 	def isEmpty(self):
 		return len(self.heap) == 0
 
 	def is_empty(self):
 		return len(self.heap) == 0
 
+	@deprecated("O(n) per call, use IndexedPriorityQueue instead")
 	def update(self, item: T, priority: float):
 		# If item already in priority queue with higher priority, update its priority and rebuild the heap.
 		# If item already in priority queue with equal or lower priority, do nothing.
@@ -49,3 +52,171 @@ class PriorityQueue(Generic[T]):
 				break
 		else:
 			self.push(item, priority)
+
+
+class IndexedPriorityQueue(Generic[T]):
+	"""
+	Binary heap that keeps a map from each item to its slot, so that membership tests are O(1)
+	and updating or removing an item is O(log n). Items must be hashable and are unique in the queue.
+	Ties are broken by insertion order.
+	"""
+
+	def __init__(self):
+		self.heap: list[list] = []
+		self.index: dict[T, int] = {}
+		self.count = 0
+
+	def __len__(self):
+		return len(self.heap)
+
+	def __contains__(self, item: T):
+		return item in self.index
+
+	def is_empty(self):
+		return len(self.heap) == 0
+
+	def priority(self, item: T) -> float:
+		return self.heap[self.index[item]][0]
+
+	def push(self, item: T, priority: float):
+		"""Insert the item, or set its priority if it is already in the queue"""
+		if item in self.index:
+			self._set_priority(self.index[item], priority)
+			return
+		self.heap.append([priority, self.count, item])
+		self.count += 1
+		self.index[item] = len(self.heap) - 1
+		self._sift_up(len(self.heap) - 1)
+
+	def pop(self) -> T:
+		return self.pop_with_priority()[1]
+
+	def pop_with_priority(self) -> tuple[float, T]:
+		priority, _, item = self.heap[0]
+		self._remove_at(0)
+		return priority, item
+
+	def peek(self) -> T:
+		return self.heap[0][2]
+
+	def remove(self, item: T):
+		self._remove_at(self.index[item])
+
+	def update(self, item: T, priority: float):
+		"""Decrease-key: same contract as PriorityQueue.update, in O(log n)"""
+		slot = self.index.get(item)
+		if slot is None:
+			self.push(item, priority)
+		elif priority < self.heap[slot][0]:
+			self._set_priority(slot, priority)
+
+	def _set_priority(self, slot: int, priority: float):
+		entry = self.heap[slot]
+		old = entry[0]
+		entry[0] = priority
+		if priority < old:
+			self._sift_up(slot)
+		else:
+			self._sift_down(slot)
+
+	def _remove_at(self, slot: int):
+		entry = self.heap[slot]
+		del self.index[entry[2]]
+		last = self.heap.pop()
+		if slot < len(self.heap):
+			self.heap[slot] = last
+			self.index[last[2]] = slot
+			self._sift_up(slot)
+			self._sift_down(self.index[last[2]])
+
+	def _swap(self, i: int, j: int):
+		heap = self.heap
+		heap[i], heap[j] = heap[j], heap[i]
+		self.index[heap[i][2]] = i
+		self.index[heap[j][2]] = j
+
+	def _sift_up(self, slot: int):
+		heap = self.heap
+		while slot > 0:
+			parent = (slot - 1) >> 1
+			if _less(heap[slot], heap[parent]):
+				self._swap(slot, parent)
+				slot = parent
+			else:
+				break
+
+	def _sift_down(self, slot: int):
+		heap = self.heap
+		size = len(heap)
+		while True:
+			smallest = slot
+			for child in (2 * slot + 1, 2 * slot + 2):
+				if child < size and _less(heap[child], heap[smallest]):
+					smallest = child
+			if smallest == slot:
+				break
+			self._swap(slot, smallest)
+			slot = smallest
+
+
+def _less(entry1: list, entry2: list) -> bool:
+	return entry1[0] < entry2[0] or (entry1[0] == entry2[0] and entry1[1] < entry2[1])
+
+
+class BucketQueue(Generic[T]):
+	"""
+	Bucket (Dial) priority queue for small integer priorities: push and pop are O(1) amortized.
+
+	Priorities are floored to their bucket, so ordering is exact for integer priorities only.
+	Inside a bucket, ties are broken on a secondary integer key (e.g. the cost g of a node):
+	tie_breaking="high" pops the largest key first, "low" the smallest and None ignores it.
+	Items with the same priority and key are popped in FIFO order.
+	"""
+
+	def __init__(self, tie_breaking: Optional[str] = "high"):
+		if tie_breaking not in ("high", "low", None):
+			raise ValueError(f"Unknown tie breaking: {tie_breaking}")
+		self.tie_breaking = tie_breaking
+		self.buckets: dict[int, dict[int, deque]] = {}
+		self.min = 0
+		self.size = 0
+
+	def __len__(self):
+		return self.size
+
+	def is_empty(self):
+		return self.size == 0
+
+	def push(self, item: T, priority: float, tie: int = 0):
+		index = floor(priority)
+		if self.tie_breaking is None:
+			tie = 0
+		bucket = self.buckets.get(index)
+		if bucket is None:
+			bucket = self.buckets[index] = {}
+			if self.size == 0 or index < self.min:
+				self.min = index
+		sub_bucket = bucket.get(tie)
+		if sub_bucket is None:
+			sub_bucket = bucket[tie] = deque()
+		sub_bucket.append(item)
+		self.size += 1
+
+	def pop(self) -> T:
+		if self.size == 0:
+			raise IndexError("pop from an empty BucketQueue")
+		while self.min not in self.buckets:
+			self.min += 1
+		bucket = self.buckets[self.min]
+		if len(bucket) == 1:
+			tie = next(iter(bucket))
+		else:
+			tie = max(bucket) if self.tie_breaking == "high" else min(bucket)
+		sub_bucket = bucket[tie]
+		item = sub_bucket.popleft()
+		if not sub_bucket:
+			del bucket[tie]
+			if not bucket:
+				del self.buckets[self.min]
+		self.size -= 1
+		return item
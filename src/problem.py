@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Tuple, Iterable, Generic, TypeVar
+from typing import Tuple, Iterable, Generic, Optional, TypeVar
 from lle import World, Action, WorldState
 from math import ceil
 from itertools import product
+from distances import DistanceOracle
+from encoding import StateEncoder
+from transitions import GridModel
+from cache import LRUCache
+import pattern_database
 
 
 T = TypeVar("T")
@@ -19,18 +24,64 @@ class SearchProblem(ABC, Generic[T]):
 	A Search Problem is a problem that can be solved by a search algorithm.
 
 	The generic parameter T is the type of the problem state, which must inherit from WorldState.
+
+	With native=True, successors are generated by a GridModel on packed states instead of stepping
+	the lle World. With check=True, the GridModel is also validated against World.step on every expansion.
+	With a cache_size, heuristic values are memoized by heuristic_signature in an LRUCache of that size.
 	"""
+	# Whether the heuristic never overestimates the remaining cost. It counts steps while g is 1 - reward, which the
+	# arrival, gem and end of game rewards lower (8 steps to the exit of an empty map cost 6), so it is not by default
+	admissible = False
 
-	def __init__(self, world: World):
+	def __init__(self, world: World, native: bool = False, check: bool = False, cache_size: Optional[int] = None):
 		self.world = world
 		world.reset()
 		self.initial_state = world.get_state()
 		self.nodes_expanded = 0
+		self.successors_generated = 0
+		self.distances = DistanceOracle.of(world)
+		self.encoder = StateEncoder(world)
+		self.model = GridModel(world, self.encoder, check) if native or check else None
+		self.heuristic_cache = None
+		if cache_size is not None:
+			self.heuristic_cache = LRUCache(cache_size)
+			self.heuristic = self._cached(self.heuristic)
+
+	def _cached(self, heuristic):
+		cache = self.heuristic_cache
+		signature = self.heuristic_signature
+
+		def cached_heuristic(problem_state: T) -> float:
+			key = signature(problem_state)
+			value = cache.get(key)
+			if value is None:
+				value = heuristic(problem_state)
+				cache.put(key, value)
+			return value
+		return cached_heuristic
+
+	def encode(self, problem_state: T) -> int:
+		"""The packed int representation of the given state, used for hashing and equality"""
+		return self.encoder.encode(problem_state)
+
+	def decode(self, key: int) -> T:
+		"""Inverse of encode"""
+		return self.encoder.decode(key)[0]
+
+	def from_key(self, problem_state: T, key: int) -> T:
+		"""The state reached from problem_state whose world part is packed in key (used with the GridModel)"""
+		return self.decode(key)
+
+	def grid_model(self) -> GridModel:
+		"""The GridModel of the problem, or a new one if it steps the lle World (native=False)"""
+		return self.model if self.model is not None else GridModel(self.world, self.encoder)
 
 	def is_goal_state(self, problem_state: T) -> bool:
 		"""Whether the given state is the goal state"""
-		self.world.set_state(problem_state)
-		return self.world.exit_rate == 1.0	
+		if self.model is not None:
+			return self.model.all_arrived(self.encode(problem_state))
+		self.set_state(problem_state)
+		return self.world.exit_rate == 1.0
 
 	@abstractmethod
 	def set_state(self, problem_state: T):
@@ -48,18 +99,36 @@ class SearchProblem(ABC, Generic[T]):
 			- the joint action that was taken to reach it
 			- the cost of taking the action
 		"""
+		if self.model is not None:
+			return self._model_successors(problem_state)
+		return self._world_successors(problem_state)
+
+	def _world_successors(self, problem_state: T) -> Iterable[Tuple[T, Tuple[Action, ...], float]]:
 		self.set_state(problem_state)
 		if self.world.done: return []
 		self.nodes_expanded += 1
 		for action in product(*self.world.available_actions()):
 			cost = self.world.step(action)
+			self.successors_generated += 1
 			yield (self.get_state(problem_state), action, cost)
 			self.set_state(problem_state)
 
+	def _model_successors(self, problem_state: T) -> Iterable[Tuple[T, Tuple[Action, ...], float]]:
+		key = self.encode(problem_state)
+		if self.model.is_done(key): return
+		self.nodes_expanded += 1
+		for new_key, action, cost in self.model.successors(key):
+			self.successors_generated += 1
+			yield (self.from_key(problem_state, new_key), action, cost)
+
 	@staticmethod
 	def _manhattan_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float:
 		return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
+	def _distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float:
+		"""Wall-aware distance between two cells, looked up in the precomputed BFS tables"""
+		return self.distances.distance(pos1, pos2)
+
 	def f(self, problem_state: T, cost: float):
 		return self.g(problem_state, cost) + self.heuristic(problem_state)
 
@@ -67,9 +136,17 @@ class SearchProblem(ABC, Generic[T]):
 		"""The cost of reaching the given state"""
 		return 1 - cost
 
+	def heuristic_signature(self, problem_state: T) -> int:
+		"""
+		The part of the packed state the heuristic depends on, here the agents positions. The heuristics treat all
+		agents alike, so their cells are sorted: states whose agents are swapped share their signature.
+		"""
+		cells = self.encoder.unpack(self.encode(problem_state))[0]
+		return self.encoder.pack(sorted(cells))
+
 	def heuristic(self, problem_state: T) -> float:
-		"""Manhattan distance for each agent to the closest exit"""
-		return max(min(self._manhattan_distance(agent, exit) for exit in self.world.exit_pos) for agent in problem_state.agents_positions)
+		"""Distance for each agent to the closest exit"""
+		return max(self.distances.to_nearest_exit(agent) for agent in problem_state.agents_positions)
 
 
 class SimpleSearchProblem(SearchProblem[WorldState]):
@@ -83,76 +160,117 @@ class SimpleSearchProblem(SearchProblem[WorldState]):
 		return self.world.get_state()
 
 class ProblemState(ABC):
-	"""A problem state is a state that can be used by a search algorithm"""
+	"""
+	A problem state is a state that can be used by a search algorithm.
 
-	def __init__(self, world_state: WorldState):
+	Hashing and equality only rely on the packed key computed by the problem's StateEncoder.
+	The world state may be omitted, in which case it is decoded from the key when first needed.
+	"""
+
+	def __init__(self, world_state: Optional[WorldState], key: int, encoder: StateEncoder):
 		self._world_state = world_state
+		self._encoder = encoder
+		self.key = key
 
 	@property
 	def world_state(self) -> WorldState:
+		if self._world_state is None:
+			self._world_state = self._encoder.decode(self.key)[0]
 		return self._world_state
 
 	@property
 	def agents_positions(self) -> Tuple[Tuple[int, int], ...]:
+		if self._world_state is None:
+			return self._encoder.agents_positions(self.key)
 		return self._world_state.agents_positions
 
-	def __key(self):
-		return (self._world_state)
-
 	def __eq__(self, other):
-		return isinstance(other, ProblemState) and self.__key() == other.__key()
+		return isinstance(other, type(self)) and self.key == other.key
 
 	def __hash__(self):
-		return hash(self.__key())
+		return hash(self.key)
 
 	def __repr__(self):
-		return f"<ProblemState {self._world_state}>"
+		return f"<ProblemState {self.world_state}>"
 
 
 class CornerProblemState(ProblemState):
-	def __init__(self, world_state: WorldState, corners: list[bool, bool, bool, bool]=[False,False,False,False]):
-		super().__init__(world_state)
+	def __init__(self, world_state: Optional[WorldState], key: int, encoder: StateEncoder, corners: int = 0):
+		super().__init__(world_state, key, encoder)
 		self._corners = corners
 
 	@property
 	def corners_rate(self) -> float:
-		return sum(self._corners)/4
+		return self._corners.bit_count() / 4
 
 	@property
 	def corners_done(self) -> bool:
-		return all(self._corners)
+		return self._corners == 0b1111
 
-	def corner_done(self, idx: int):
-		return self._corners[idx]
-
-	def __key(self):
-		return (self._world_state, tuple(self._corners))
-
-	def __eq__(self, other):
-		return isinstance(other, CornerProblemState) and self.__key() == other.__key()
+	@property
+	def corners_mask(self) -> int:
+		return self._corners
 
-	def __hash__(self):
-		return hash(self.__key())
+	def corner_done(self, idx: int):
+		return bool(self._corners >> idx & 1)
 
 	def __repr__(self):
-		return f"<CornerProblemState {self._world_state} {self._corners}>"
-
-	def get_new_state(self, new_world_state, corners_pos):
-		new_corners = self._corners.copy()
-		for i in range(len(corners_pos)):
-			if corners_pos[i] in self._world_state.agents_positions:
-				new_corners[i] = True
-		return CornerProblemState(new_world_state, new_corners)
+		return f"<CornerProblemState {self.world_state} {self._corners:04b}>"
+
+	def get_new_state(self, new_world_state: WorldState, corners_index: dict[Tuple[int, int], int]):
+		new_corners = self._corners
+		for pos in new_world_state.agents_positions:
+			new_corners |= corners_index.get(pos, 0)
+		return CornerProblemState(new_world_state, self._encoder.encode(new_world_state, new_corners), self._encoder, new_corners)
+
+	def get_new_key_state(self, key: int, corners_index: dict[int, int]):
+		"""Same as get_new_state for a packed world state (whose extra bits are ignored)"""
+		encoder = self._encoder
+		cells, gems, _ = encoder.unpack(key)
+		new_corners = self._corners
+		for cell in cells:
+			new_corners |= corners_index.get(cell, 0)
+		return CornerProblemState(None, encoder.pack(cells, gems, new_corners), encoder, new_corners)
 
 class CornerSearchProblem(SearchProblem[CornerProblemState]):
-	def __init__(self, world: World):
-		super().__init__(world)
+	"""
+	With a patterns directory, the heuristic is looked up in the pattern databases of the corners stored there
+	(see pattern_database), which are built on the first use of the map.
+	"""
+	def __init__(
+		self,
+		world: World,
+		native: bool = False,
+		check: bool = False,
+		cache_size: Optional[int] = None,
+		patterns: Optional[str] = None,
+	):
+		super().__init__(world, native, check, cache_size)
 		self.corners = [(0, 0), (0, world.width - 1), (world.height - 1, 0), (world.height - 1, world.width - 1)]
-		self.initial_state = CornerProblemState(world.get_state())
+		self.patterns = [] if patterns is None else pattern_database.load(patterns, self.distances, self.corners, world.n_agents)
+		self._corners_index = {}
+		for i, corner in enumerate(self.corners):
+			self._corners_index[corner] = self._corners_index.get(corner, 0) | 1 << i
+		self._corners_cells = {self.encoder.cell(corner): mask for corner, mask in self._corners_index.items()}
+		initial_state = world.get_state()
+		self.initial_state = CornerProblemState(initial_state, self.encoder.encode(initial_state), self.encoder)
+
+	@override(SearchProblem)
+	def encode(self, state: CornerProblemState) -> int:
+		return state.key
+
+	@override(SearchProblem)
+	def decode(self, key: int) -> CornerProblemState:
+		# The world state is only unpacked when needed: the heuristic reads the key
+		return CornerProblemState(None, key, self.encoder, self.encoder.extra(key))
+
+	@override(SearchProblem)
+	def from_key(self, state: CornerProblemState, key: int) -> CornerProblemState:
+		return state.get_new_key_state(key, self._corners_cells)
 
 	@override(SearchProblem)
 	def is_goal_state(self, state: CornerProblemState) -> bool:
-		return state.corners_done and super().is_goal_state(state.world_state)
+		return state.corners_done and super().is_goal_state(state)
 
 	@override(SearchProblem)
 	def set_state(self, state: CornerProblemState):
@@ -160,55 +278,88 @@ class CornerSearchProblem(SearchProblem[CornerProblemState]):
 
 	@override(SearchProblem)
 	def get_state(self, state: CornerProblemState) -> CornerProblemState:
-		return state.get_new_state(self.world.get_state(), self.corners)
+		return state.get_new_state(self.world.get_state(), self._corners_index)
+
+	@override(SearchProblem)
+	def heuristic_signature(self, state: CornerProblemState) -> int:
+		"""The agents positions and the corners visited: the gems do not matter"""
+		cells, _, corners = self.encoder.unpack(state.key)
+		return self.encoder.pack(sorted(cells), 0, corners)
 
 	@override(SearchProblem)
 	def heuristic(self, state: CornerProblemState) -> float:
 		"""
 		Calculates the shortest distance to go one time to each corner not visited and then on the exit
 		"""
+		if self.patterns:
+			cells = self.encoder.unpack(state.key)[0]
+			remaining = 0b1111 & ~state.corners_mask
+			return max(db.lookup(cells, remaining) for db in self.patterns)
 		n_agents = len(state.agents_positions)
 		if state.corners_done: return super().heuristic(state)
 		unvisited_corners = [self.corners[i] for i in range(len(self.corners)) if not state.corner_done(i)]
-		h = max(min(self._manhattan_distance(agent, unvisited_corners[i]) for i in range(len(unvisited_corners))) for agent in state.agents_positions)
+		h = max(min(self._distance(agent, unvisited_corners[i]) for i in range(len(unvisited_corners))) for agent in state.agents_positions)
 		if len(unvisited_corners) > 1:
-			h += (self._manhattan_distance(unvisited_corners[0], unvisited_corners[1]) * (len(unvisited_corners) - 1)) / n_agents
-		h += min(self._manhattan_distance(unvisited_corner, exit_pos) for unvisited_corner in unvisited_corners for exit_pos in self.world.exit_pos)
+			h += (self._distance(unvisited_corners[0], unvisited_corners[1]) * (len(unvisited_corners) - 1)) / n_agents
+		h += min(self.distances.to_nearest_exit(unvisited_corner) for unvisited_corner in unvisited_corners)
 		return h
 
 class GemProblemState(ProblemState):
-	
-	def __init__(self, world_state: WorldState):
-		super().__init__(world_state)
 
 	@property
 	def gems_done(self) -> float:
-		return all(self._world_state.gems_collected)
+		return self._encoder.gems(self.key) == self._encoder.gems_mask
 
 	@property
 	def gems_remaining(self):
-		return len(self._world_state.gems_collected) - sum(self._world_state.gems_collected)
+		return self._encoder.n_gems - self._encoder.gems(self.key).bit_count()
 
-	def __key(self):
-		return self._world_state
-
-	def __hash__(self):
-		return hash(self.__key())
-
-	def __eq__(self, other):
-		return isinstance(other, GemProblemState) and self.__key() == other.__key()
+	def gem_collected(self, idx: int) -> bool:
+		return bool(self._encoder.gems(self.key) >> idx & 1)
 
 	def __repr__(self):
-		return f"<GemProblemState {self._world_state}>"
+		return f"<GemProblemState {self.world_state}>"
 
 class GemSearchProblem(SearchProblem[GemProblemState]):
-	def __init__(self, world: World):
-		super().__init__(world)
-		self.initial_state = GemProblemState(world.get_state())
+	"""
+	With a patterns directory, the heuristic is also bounded by the pattern databases of the gems stored there
+	(see pattern_database), which are built on the first use of the map.
+	"""
+	# Every step costs 1 and the heuristic bounds the number of steps left from below
+	admissible = True
+
+	def __init__(
+		self,
+		world: World,
+		native: bool = False,
+		check: bool = False,
+		cache_size: Optional[int] = None,
+		patterns: Optional[str] = None,
+	):
+		super().__init__(world, native, check, cache_size)
+		initial_state = world.get_state()
+		self.initial_state = GemProblemState(initial_state, self.encoder.encode(initial_state), self.encoder)
+		self.gems = [pos for pos, _ in world.gems]
+		# Minimum spanning tree weights, indexed by bitmask of remaining gems
+		self._spanning_trees: dict[int, float] = {0: 0.0}
+		self.patterns = [] if patterns is None else pattern_database.load(patterns, self.distances, self.gems, world.n_agents)
+
+	@override(SearchProblem)
+	def encode(self, state: GemProblemState) -> int:
+		return state.key
+
+	@override(SearchProblem)
+	def decode(self, key: int) -> GemProblemState:
+		# The world state is only unpacked when needed: the heuristic reads the key
+		return GemProblemState(None, key, self.encoder)
+
+	@override(SearchProblem)
+	def from_key(self, _: GemProblemState, key: int) -> GemProblemState:
+		return GemProblemState(None, key, self.encoder)
 
 	@override(SearchProblem)
 	def is_goal_state(self, state: GemProblemState) -> bool:
-		return state.gems_done and super().is_goal_state(state.world_state)
+		return state.gems_done and super().is_goal_state(state)
 
 	@override(SearchProblem)
 	def set_state(self, state: GemProblemState):
@@ -216,21 +367,59 @@ class GemSearchProblem(SearchProblem[GemProblemState]):
 
 	@override(SearchProblem)
 	def get_state(self, state: GemProblemState) -> GemProblemState:
-		return GemProblemState(self.world.get_state())
+		world_state = self.world.get_state()
+		return GemProblemState(world_state, self.encoder.encode(world_state), self.encoder)
 
 	@override(SearchProblem)
 	def g(self, state: GemProblemState, _):
 		return 1
 
+	@override(SearchProblem)
+	def heuristic_signature(self, state: GemProblemState) -> int:
+		"""The agents positions and the gems collected"""
+		cells, gems, _ = self.encoder.unpack(state.key)
+		return self.encoder.pack(sorted(cells), gems)
+
+	def spanning_tree(self, remaining: int) -> float:
+		"""
+		Weight of a minimum spanning tree over the remaining gems and the exits, merged in a single node.
+		Computed once per bitmask of remaining gems.
+		"""
+		weight = self._spanning_trees.get(remaining)
+		if weight is not None:
+			return weight
+		gems = [self.gems[i] for i in range(len(self.gems)) if remaining >> i & 1]
+		# Prim's algorithm, grown from the exits
+		links = [self.distances.to_nearest_exit(gem) for gem in gems]
+		weight = 0.0
+		while links:
+			i = min(range(len(links)), key=links.__getitem__)
+			weight += links[i]
+			gem = gems.pop(i)
+			links.pop(i)
+			links = [min(link, self._distance(gem, other)) for link, other in zip(links, gems)]
+		self._spanning_trees[remaining] = weight
+		return weight
+
 	@override(SearchProblem)
 	def heuristic(self, state: GemProblemState) -> float:
 		"""
-		Calculates the shortest distance to go one time to each gem not visited and then on the exit
+		The largest of three lower bounds on the number of steps left:
+		 - every agent has to reach an exit;
+		 - every remaining gem has to be reached by an agent which then goes to an exit;
+		 - the agents walk, together, at least from the closest gem to a spanning tree of the remaining gems and
+		   the exits, and they make at most one move each per step.
 		"""
-		n_agents = len(state.agents_positions)
-		if state.gems_done: return super().heuristic(state)
-		unvisited_gems = [self.world.gems[i][0] for i in range(len(self.world.gems)) if not state.world_state.gems_collected[i]]
-		h = max(min(self._manhattan_distance(agent, unvisited_gems[i]) for i in range(len(unvisited_gems))) for agent in state.agents_positions)
-		h += ceil((len(unvisited_gems)-1) / n_agents)
-		h += min(max(self._manhattan_distance(unvisited_gem, exit_pos) for unvisited_gem in unvisited_gems) for exit_pos in self.world.exit_pos)
-		return h
+		h = super().heuristic(state)
+		remaining = self.encoder.gems_mask & ~self.encoder.gems(state.key)
+		if self.patterns:
+			cells = self.encoder.unpack(state.key)[0]
+			h = max(h, max(db.lookup(cells, remaining) for db in self.patterns))
+		if remaining == 0: return h
+		agents = state.agents_positions
+		gems = [self.gems[i] for i in range(len(self.gems)) if remaining >> i & 1]
+		to_gems = [min(self._distance(agent, gem) for agent in agents) for gem in gems]
+		h = max(h, max(d + self.distances.to_nearest_exit(gem) for d, gem in zip(to_gems, gems)))
+		walk = min(to_gems) + self.spanning_tree(remaining)
+		if walk == float("inf"): return walk
+		return max(h, ceil(walk / len(agents)))
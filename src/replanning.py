@@ -0,0 +1,163 @@
+from operator import itemgetter
+from typing import Iterable, Optional, Tuple
+from lle import World, WorldState, Action
+from priority_queue import IndexedPriorityQueue
+from problem import SimpleSearchProblem
+from search import Solution
+from transitions import GridModel
+
+
+INFINITY = float("inf")
+
+
+class DStarLite:
+	"""
+	Incremental replanning (D* Lite, Koenig and Likhachev) of a SimpleSearchProblem, on the positions of the agents.
+
+	The search runs backward from every goal configuration, so that g is the number of steps left to a goal and
+	stays valid when the agents move. After a change of the map (change_world) or of the start (move_to), the g
+	and rhs values of the previous searches are kept and only the states whose distance changed are expanded again.
+	Every joint step costs 1, as in bfs. Expansions are counted in the nodes_expanded of the problem.
+	"""
+
+	def __init__(self, problem: SimpleSearchProblem):
+		if not isinstance(problem, SimpleSearchProblem):
+			raise ValueError(f"DStarLite needs the goal states up front, which {type(problem).__name__} does not give")
+		self.problem = problem
+		self.encoder = problem.encoder
+		self.model = problem.grid_model()
+		self._positions_mask = self.encoder.agents_mask
+		self.start = problem.encode(problem.initial_state) & self._positions_mask
+		self._start_positions = self._positions(self.start)
+		# Sum of the heuristic between the successive starts, added to the keys instead of reordering the queue
+		self._km = 0
+		self.g: dict[int, float] = {}
+		self.rhs: dict[int, float] = {}
+		self._queue = IndexedPriorityQueue()
+		self.goals = set(self.model.goals())
+		for goal in self.goals:
+			self.rhs[goal] = 0
+			self._queue.push(goal, self._key(goal))
+
+	def plan(self) -> Optional[Solution]:
+		"""A shortest plan from the current start, repairing the previous search first"""
+		self._compute()
+		if self.rhs.get(self.start, INFINITY) == INFINITY:
+			return None
+		actions = []
+		key = self.start
+		# Along a shortest plan, g decreases by one at each step
+		for _ in range(int(self.rhs[self.start])):
+			candidates = ((self.g.get(new_key, INFINITY), new_key, action) for new_key, action in self._successors(key))
+			_, key, action = min(candidates, key=itemgetter(0))
+			actions.append(action)
+		return Solution(actions=actions)
+
+	def move_to(self, state: WorldState):
+		"""Plan from the given state from now on, e.g. when the agents deviated from the plan"""
+		start = self.encoder.encode(state) & self._positions_mask
+		self._km += self._heuristic(start)
+		self.start = start
+		self._start_positions = self._positions(start)
+
+	def change_world(self, world: World):
+		"""
+		Plan in the given world, a changed version of the current one (walls, lasers or exits added, removed or moved)
+		with the same size and agents. The states with an agent on or next to a changed cell are updated.
+		"""
+		if (world.height, world.width, world.n_agents) != (self.encoder.height, self.encoder.width, self.encoder.n_agents):
+			raise ValueError("The changed world must have the same size and number of agents")
+		old, new = self.model, GridModel(world, self.encoder)
+		changed = {cell for cell, moves in enumerate(old.moves) if moves != new.moves[cell]}
+		changed |= old.exits ^ new.exits
+		if old.beams != new.beams:
+			changed |= {cell for _, beam in set(old.beams) ^ set(new.beams) for cell in beam}
+		# The edges which changed leave a state with an agent on or next to a changed cell
+		affected = self._around(changed)
+		# New edges may also come from states never reached so far into a known state
+		near = self._around(affected)
+		self.model = new
+		old_goals, self.goals = self.goals, set(new.goals())
+		known = set(self.g) | set(self.rhs)
+		for key in known | old_goals | self.goals:
+			cells = self.encoder.unpack(key)[0]
+			if key in self.goals or key in old_goals or not affected.isdisjoint(cells):
+				self._update_rhs(key)
+				self._update_queue(key)
+			if not near.isdisjoint(cells):
+				for previous, _ in self.model.predecessors(key):
+					if previous not in known:
+						self._update_rhs(previous)
+						self._update_queue(previous)
+
+	def _around(self, cells: set[int]) -> set[int]:
+		"""The cells and their neighbours"""
+		around = set(cells)
+		for cell in cells:
+			i, j = self.encoder.position(cell)
+			for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+				if 0 <= ni < self.encoder.height and 0 <= nj < self.encoder.width:
+					around.add(self.encoder.cell((ni, nj)))
+		return around
+
+	def _positions(self, key: int) -> list[Tuple[int, int]]:
+		return [self.encoder.position(cell) for cell in self.encoder.unpack(key)[0]]
+
+	def _heuristic(self, key: int) -> float:
+		"""Steps between the start and the given state: each agent needs at least its Manhattan distance"""
+		return max(abs(i - si) + abs(j - sj) for (i, j), (si, sj) in zip(self._positions(key), self._start_positions))
+
+	def _key(self, key: int) -> Tuple[float, float]:
+		value = min(self.g.get(key, INFINITY), self.rhs.get(key, INFINITY))
+		return value + self._heuristic(key) + self._km, value
+
+	def _successors(self, key: int) -> Iterable[Tuple[int, Tuple[Action, ...]]]:
+		if self.model.is_done(key): return
+		for new_key, action, _ in self.model.successors(key):
+			self.problem.successors_generated += 1
+			yield new_key & self._positions_mask, action
+
+	def _update_rhs(self, key: int):
+		if key in self.goals:
+			self.rhs[key] = 0
+		else:
+			self.rhs[key] = min((1 + self.g.get(new_key, INFINITY) for new_key, _ in self._successors(key)), default=INFINITY)
+
+	def _update_queue(self, key: int):
+		if self.g.get(key, INFINITY) != self.rhs.get(key, INFINITY):
+			self._queue.push(key, self._key(key))
+		elif key in self._queue:
+			self._queue.remove(key)
+
+	def _compute(self):
+		queue = self._queue
+		while not queue.is_empty():
+			start_key = self._key(self.start)
+			top = queue.peek()
+			if queue.priority(top) >= start_key and self.rhs.get(self.start, INFINITY) == self.g.get(self.start, INFINITY):
+				break
+			old_priority, key = queue.pop_with_priority()
+			new_priority = self._key(key)
+			if old_priority < new_priority:
+				# The start moved since the key was computed
+				queue.push(key, new_priority)
+				continue
+			self.problem.nodes_expanded += 1
+			g = self.g.get(key, INFINITY)
+			rhs = self.rhs.get(key, INFINITY)
+			if g > rhs:
+				self.g[key] = rhs
+				for previous, _ in self.model.predecessors(key):
+					self.problem.successors_generated += 1
+					if previous not in self.goals and 1 + rhs < self.rhs.get(previous, INFINITY):
+						self.rhs[previous] = 1 + rhs
+						self._update_queue(previous)
+			else:
+				self.g[key] = INFINITY
+				for previous, _ in self.model.predecessors(key):
+					self.problem.successors_generated += 1
+					if self.rhs.get(previous, INFINITY) == 1 + g:
+						self._update_rhs(previous)
+					self._update_queue(previous)
+				self._update_rhs(key)
+				self._update_queue(key)
@@ -1,24 +1,43 @@
+from array import array
 from dataclasses import dataclass
-from typing import Optional, Generic, TypeVar
+from math import inf
+from typing import Generator, Iterable, Iterator, Optional, Generic, TypeVar, Union
 from lle import Action
 from abc import ABC, abstractmethod
-from queue import Queue as qQueue, LifoQueue
-from priority_queue import PriorityQueue
+from collections import deque
+from time import perf_counter
+import resource
+from priority_queue import PriorityQueue, IndexedPriorityQueue, BucketQueue
+from cache import LRUCache
 
-from problem import SearchProblem, override
+from problem import SearchProblem, SimpleSearchProblem, override
+from transitions import GridModel
+from instrumentation import SearchHooks, SearchMonitor
 
 
 
+# lle actions are not hashable: pack_action stores them as their value
+N_ACTIONS = len(Action.ALL)
+_ACTIONS = {action.value: action for action in Action.ALL}
+
+
 #################### frontier.py ####################
 
 T = TypeVar("T")
 
 class Frontier(ABC, Generic[T]):
+	# Whether a node pushed with a cheaper cost replaces the one already known for the same state
+	reopens = False
 
 	@abstractmethod
 	def push(node: T) -> None:
 		""" Add a node to the frontier. """
 
+	def push_many(self, nodes: Iterable[T]) -> None:
+		""" Add a batch of nodes to the frontier, in order. """
+		for node in nodes:
+			self.push(node)
+
 	@abstractmethod
 	def pop() -> T:
 		""" Remove and return the next node from the frontier. """
@@ -27,70 +46,139 @@ class Frontier(ABC, Generic[T]):
 	def is_empty() -> bool:
 		""" Return True if the frontier is empty. """
 
+	@abstractmethod
+	def __len__() -> int:
+		""" Number of nodes in the frontier. """
+
 
 class Stack(Frontier[T]):
+	"""LIFO frontier on a deque: unlike queue.LifoQueue, no lock is taken on push and pop"""
 
 	def __init__(self):
-		self.queue = LifoQueue()
+		self.queue = deque()
 
 	@override(Frontier)
 	def push(self, node: T) -> None:
-		self.queue.put(node)
+		self.queue.append(node)
+
+	@override(Frontier)
+	def push_many(self, nodes: Iterable[T]) -> None:
+		self.queue.extend(nodes)
 
 	@override(Frontier)
 	def pop(self) -> T:
-		return self.queue.get()
+		return self.queue.pop()
 
 	@override(Frontier)
 	def is_empty(self) -> bool:
-		return self.queue.empty()
+		return not self.queue
+
+	@override(Frontier)
+	def __len__(self) -> int:
+		return len(self.queue)
 
 
 class Queue(Frontier[T]):
+	"""FIFO frontier on a deque: unlike queue.Queue, no lock is taken on push and pop"""
 
 	def __init__(self):
-		self.queue = qQueue()
+		self.queue = deque()
 
 	@override(Frontier)
 	def push(self, node: T) -> None:
-		self.queue.put(node)
+		self.queue.append(node)
+
+	@override(Frontier)
+	def push_many(self, nodes: Iterable[T]) -> None:
+		self.queue.extend(nodes)
 
 	@override(Frontier)
 	def pop(self) -> T:
-		return self.queue.get()
+		return self.queue.popleft()
 
 	@override(Frontier)
 	def is_empty(self) -> bool:
-		return self.queue.empty()
+		return not self.queue
+
+	@override(Frontier)
+	def __len__(self) -> int:
+		return len(self.queue)
 
 
 class Heap(Frontier[T]):
+	reopens = True
 
 	def __init__(self):
-		self.queue = PriorityQueue()
+		self.queue = IndexedPriorityQueue()
+		self.nodes = {}
 
 	@override(Frontier)
 	def push(self, node: T) -> None:
-		self.queue.push(node, node.priority)
+		"""Push the node, replacing (decrease-key) any node of the same state still in the frontier"""
+		self.nodes[node.key] = node
+		self.queue.push(node.key, node.priority)
 
 	@override(Frontier)
 	def pop(self) -> T:
-		return self.queue.pop()
+		return self.nodes.pop(self.queue.pop())
+
+	def __contains__(self, key: int) -> bool:
+		return key in self.queue
 
 	@override(Frontier)
 	def is_empty(self) -> bool:
 		return self.queue.is_empty()
 
+	@override(Frontier)
+	def __len__(self) -> int:
+		return len(self.queue)
+
+
+class Bucket(Frontier[T]):
+	"""
+	Dial frontier for integer priorities, with O(1) push and pop. Ties on the priority are broken
+	on the node cost (see BucketQueue). Nodes with an infinite priority cannot reach a goal and are dropped.
+	"""
+	reopens = True
+
+	def __init__(self, tie_breaking: Optional[str] = "high"):
+		self.queue = BucketQueue(tie_breaking)
+		self.nodes = {}
+
+	@override(Frontier)
+	def push(self, node: T) -> None:
+		if node.priority == inf: return
+		# A node replaced by a cheaper one stays in its bucket and is skipped when popped
+		self.nodes[node.key] = node
+		self.queue.push(node, node.priority, int(node.cost))
+
+	@override(Frontier)
+	def pop(self) -> T:
+		while True:
+			node = self.queue.pop()
+			if self.nodes.get(node.key) is node:
+				del self.nodes[node.key]
+				return node
+
+	@override(Frontier)
+	def is_empty(self) -> bool:
+		return len(self.nodes) == 0
+
+	@override(Frontier)
+	def __len__(self) -> int:
+		return len(self.nodes)
 
 
 class Node:
+	__slots__ = ("parent", "state", "action", "cost", "priority", "key")
 
-	def __init__(self, parent, state, action, cost, priority=0):
+	def __init__(self, parent, state, action, cost, priority=0, key=None):
 		self.parent = parent
 		self.state = state
 		self.action = action
 		self.cost = cost
 		self.priority = priority
+		self.key = key
 
 	def __repr__(self):
 		return f"<Node {self.state}, {self.action}>"
@@ -113,6 +201,115 @@ class Node:
 		return list(reversed(actions))
 
 
+class MemoryNode(Node):
+	"""
+	Node of the tree kept by sma_star. Two nodes may hold the same state, so they are compared by identity.
+	priority is the backed up f: the lowest f below the node, including its forgotten descendants.
+	"""
+	__slots__ = ("index", "depth", "expanded", "children", "pending")
+	__eq__ = object.__eq__
+	__hash__ = object.__hash__
+
+	def __init__(self, parent, state, action, cost, priority, key, index=None):
+		super().__init__(parent, state, action, cost, priority, key)
+		# Position of the node in the successors of its parent
+		self.index = index
+		self.depth = 0 if parent is None else parent.depth + 1
+		self.expanded = False
+		self.children: list[MemoryNode] = []
+		# f, state, joint action and g of the successors that are not in memory, by their index in get_successors
+		self.pending: dict[int, tuple] = {}
+
+	def next_f(self) -> float:
+		"""f of the next node this one gives when selected: itself before expansion, then its best pending successor"""
+		if not self.expanded:
+			return self.priority
+		return min((f for f, _, _, _ in self.pending.values()), default=inf)
+
+	def backed_up_f(self) -> float:
+		return min(self.next_f(), min((child.priority for child in self.children), default=inf))
+
+	def on_path(self, key: int) -> bool:
+		node = self
+		while node is not None:
+			if node.key == key:
+				return True
+			node = node.parent
+		return False
+
+
+def pack_action(joint_action: tuple[Action]) -> int:
+	"""The joint action as an int, its agent actions being digits in base len(Action.ALL)"""
+	code = 0
+	for action in joint_action:
+		code = code * N_ACTIONS + action.value
+	return code
+
+
+def unpack_action(code: int, n_agents: int) -> tuple[Action]:
+	"""Inverse of pack_action"""
+	joint_action = []
+	for _ in range(n_agents):
+		code, value = divmod(code, N_ACTIONS)
+		joint_action.append(_ACTIONS[value])
+	joint_action.reverse()
+	return tuple(joint_action)
+
+
+class NodeStore:
+	"""
+	The nodes generated by a search as parallel arrays: the row of the parent and the joint action of each node,
+	packed in base len(Action.ALL) (up to 13 agents). Expanded nodes only live on here, a dozen bytes each, and the
+	frontier holds CompactNodes pointing to their row.
+	"""
+
+	def __init__(self):
+		self.parents = array("q")
+		self.actions = array("I")
+		self.n_agents = 0
+
+	def __len__(self) -> int:
+		return len(self.parents)
+
+	def add(self, parent: int, action: Optional[tuple[Action]]) -> int:
+		"""Record a node (parent -1 for the root) and return its row"""
+		code = 0
+		if action is not None:
+			self.n_agents = len(action)
+			code = pack_action(action)
+		self.parents.append(parent)
+		self.actions.append(code)
+		return len(self.parents) - 1
+
+	def get_actions(self, row: int) -> list[tuple[Action]]:
+		"""The joint actions from the root to the node of the given row"""
+		actions = []
+		while self.parents[row] >= 0:
+			actions.append(unpack_action(self.actions[row], self.n_agents))
+			row = self.parents[row]
+		actions.reverse()
+		return actions
+
+
+class CompactNode:
+	"""Frontier node of search(): its ancestry is kept in a NodeStore, at row"""
+	__slots__ = ("state", "cost", "priority", "key", "store", "row")
+
+	def __init__(self, state, cost, priority, key, store, row):
+		self.state = state
+		self.cost = cost
+		self.priority = priority
+		self.key = key
+		self.store = store
+		self.row = row
+
+	def __repr__(self):
+		return f"<CompactNode {self.state}, row {self.row}>"
+
+	def get_actions(self) -> list[tuple[Action]]:
+		return self.store.get_actions(self.row)
+
+
 #################### search.py ####################
 
 
@@ -125,27 +322,724 @@ class Solution:
 		return len(self.actions)
 
 
-def search(problem: SearchProblem, Frontier: type[Stack, Queue, Heap]) -> Optional[Solution]:
-	frontier = Frontier()
-	frontier.push(Node(None, problem.initial_state, None, 0))
-	visited = {problem.initial_state}
+def search(
+	problem: SearchProblem,
+	Frontier: type[Frontier],
+	weight: float = 1.0,
+	monitor: Optional[SearchMonitor] = None,
+) -> Optional[Solution]:
+	"""
+	Graph search with the given frontier. Nodes are prioritised on g + weight * h (weighted A* when weight > 1).
+	With a monitor, the search reports its events and counters to it (see SearchMonitor).
+	"""
+	loop = _search(problem, Frontier(), weight, SearchHooks() if monitor is None else monitor)
+	while True:
+		try:
+			next(loop)
+		except StopIteration as stop:
+			return stop.value
+
+
+def _search(
+	problem: SearchProblem,
+	frontier: Frontier,
+	weight: float,
+	hooks: SearchHooks,
+) -> Generator[CompactNode, None, Optional[Solution]]:
+	"""
+	The loop of search() and SearchRun: yields every node that is not a goal before expanding it, and returns the
+	Solution, or None
+	"""
+	is_goal_state, get_successors, heuristic = hooks.bind(problem)
+	store = NodeStore()
+	key = problem.encode(problem.initial_state)
+	hooks.push_many(frontier, [CompactNode(problem.initial_state, 0, 0, key, store, store.add(-1, None))])
+	# Best known cost of every generated state, only improved upon when the frontier reopens nodes
+	visited = {key: 0}
 	while not frontier.is_empty():
 		node = frontier.pop()
-		if problem.is_goal_state(node.state):
-			return Solution(actions=node.get_actions())
-		for state, action, cost in problem.get_successors(node.state):
-			if state in visited: continue
-			visited.add(state)
-			next_node = Node(node, state, action, node.cost + problem.g(state, cost), node.cost + problem.f(state, cost))
-			frontier.push(next_node)
+		hooks.pop(node)
+		if is_goal_state(node.state):
+			hooks.goal(node)
+			return Solution(actions=store.get_actions(node.row))
+		yield node
+		successors = get_successors(node.state)
+		hooks.expand(node, successors)
+		children = []
+		for successor in successors:
+			state, action, cost = successor
+			key = problem.encode(state)
+			g = node.cost + problem.g(state, cost)
+			if key in visited and (not frontier.reopens or visited[key] <= g):
+				hooks.duplicate(node, successor)
+				continue
+			visited[key] = g
+			children.append(CompactNode(state, g, g + weight * heuristic(state), key, store, store.add(node.row, action)))
+		hooks.push_many(frontier, children)
 	return None
 
 
+@dataclass
+class Progress:
+	expanded: int
+	frontier_size: int
+	# Priority (g + weight * h) of the last node popped: with A* and a consistent heuristic, a lower bound on the cost
+	f: float
+	time: float
+
+@dataclass
+class BudgetExceeded:
+	# "expansions", "time", "memory" or "cancelled"
+	reason: str
+	progress: Progress
+
+class SearchRun:
+	"""
+	search() as a generator: iterating runs the search and yields a Progress every `every` expansions. Once the
+	iteration is over, result holds the Solution, None if there is none, or a BudgetExceeded when the search stopped
+	on its budget: max_expansions, max_time (seconds) or max_memory (current RSS of the process, in bytes, checked at
+	each Progress). The caller cancels the search with cancel() or by leaving the iteration early.
+
+		run = SearchRun(problem, Heap, max_time=10)
+		for progress in run:
+			print(progress)
+		print(run.result)
+	"""
+
+	def __init__(
+		self,
+		problem: SearchProblem,
+		Frontier: type[Frontier],
+		weight: float = 1.0,
+		max_expansions: Optional[int] = None,
+		max_time: Optional[float] = None,
+		max_memory: Optional[int] = None,
+		every: int = 1000,
+	):
+		self.problem = problem
+		self.Frontier = Frontier
+		self.weight = weight
+		self.max_expansions = max_expansions
+		self.max_time = max_time
+		self.max_memory = max_memory
+		self.every = every
+		self.result: Optional[Union[Solution, BudgetExceeded]] = None
+		self._cancelled = False
+
+	def cancel(self):
+		"""Stop the search before its next expansion, e.g. from a callback or another thread"""
+		self._cancelled = True
+
+	def run(self) -> Optional[Union[Solution, BudgetExceeded]]:
+		"""Run the search to its end, ignoring the progress"""
+		for _ in self:
+			pass
+		return self.result
+
+	def __iter__(self) -> Iterator[Progress]:
+		start = perf_counter()
+		end = inf if self.max_time is None else start + self.max_time
+		max_expansions = inf if self.max_expansions is None else self.max_expansions
+		frontier = self.Frontier()
+		loop = _search(self.problem, frontier, self.weight, SearchHooks())
+		expanded = 0
+		f = 0
+		finished = False
+		try:
+			while True:
+				# The loop stops at each node once it is popped and found not to be a goal, before expanding it: a
+				# budget that is just enough to reach the goal is not exceeded
+				try:
+					f = next(loop).priority
+				except StopIteration as stop:
+					self.result = stop.value
+					finished = True
+					return
+				if expanded > 0 and expanded % self.every == 0:
+					progress = Progress(expanded, len(frontier), f, perf_counter() - start)
+					if self.max_memory is not None and _rss() >= self.max_memory:
+						self.result = BudgetExceeded("memory", progress)
+						finished = True
+						return
+					yield progress
+				if self._cancelled or expanded >= max_expansions or perf_counter() >= end:
+					reason = "cancelled" if self._cancelled else "expansions" if expanded >= max_expansions else "time"
+					self.result = BudgetExceeded(reason, Progress(expanded, len(frontier), f, perf_counter() - start))
+					finished = True
+					return
+				expanded += 1
+		finally:
+			# The caller left the iteration early
+			if not finished:
+				self.result = BudgetExceeded("cancelled", Progress(expanded, len(frontier), f, perf_counter() - start))
+
+def _rss() -> int:
+	"""Memory resident in the process now, in bytes. Without /proc, its peak since the process started."""
+	try:
+		with open("/proc/self/statm") as statm:
+			return int(statm.read().split()[1]) * resource.getpagesize()
+	except OSError:
+		# In kilobytes on Linux
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
 def dfs(problem: SearchProblem) -> Optional[Solution]:
 	return search(problem, Stack)
 
 def bfs(problem: SearchProblem) -> Optional[Solution]:
 	return search(problem, Queue)
 
+def bidirectional_bfs(problem: SimpleSearchProblem) -> Optional[Solution]:
+	"""
+	Shortest plan found by a BFS from the initial state and a BFS backward from every goal configuration
+	(each agent alive on a distinct exit), expanding one whole layer of the smaller side at a time until they meet.
+
+	Only SimpleSearchProblem has its goals known up front, other problems raise ValueError. The search runs on
+	the GridModel of the problem, or a new one: gems do not change the moves of the agents and are ignored.
+	"""
+	if not isinstance(problem, SimpleSearchProblem):
+		raise ValueError(f"bidirectional_bfs needs the goal states up front, which {type(problem).__name__} does not give")
+	model = problem.grid_model()
+	positions_mask = problem.encoder.agents_mask
+
+	def successors(key: int):
+		if model.is_done(key): return
+		problem.nodes_expanded += 1
+		for new_key, action, _ in model.successors(key):
+			problem.successors_generated += 1
+			yield new_key & positions_mask, action
+
+	def predecessors(key: int):
+		problem.nodes_expanded += 1
+		for predecessor in model.predecessors(key):
+			problem.successors_generated += 1
+			yield predecessor
+
+	start = problem.encode(problem.initial_state) & positions_mask
+	# Each side maps a state to its neighbour towards the start (forward) or a goal (backward) and the joint action between them
+	forward = {start: None}
+	backward = {goal: None for goal in model.goals()}
+	if start in backward:
+		return Solution(actions=[])
+	forward_layer, backward_layer = [start], list(backward)
+	while forward_layer and backward_layer:
+		# Once a layer meets the other side, every meeting state is on a shortest plan
+		if len(forward_layer) <= len(backward_layer):
+			forward_layer, meeting = _expand_layer(forward_layer, forward, backward, successors)
+		else:
+			backward_layer, meeting = _expand_layer(backward_layer, backward, forward, predecessors)
+		if meeting is not None:
+			return Solution(actions=_join(meeting, forward, backward))
+	return None
+
+def _expand_layer(layer: list[int], parents: dict, others: dict, neighbours) -> tuple[list[int], Optional[int]]:
+	next_layer = []
+	for key in layer:
+		for neighbour, action in neighbours(key):
+			if neighbour in parents: continue
+			parents[neighbour] = (key, action)
+			if neighbour in others:
+				return next_layer, neighbour
+			next_layer.append(neighbour)
+	return next_layer, None
+
+def _join(meeting: int, forward: dict, backward: dict) -> list[tuple[Action]]:
+	actions = []
+	key = meeting
+	while forward[key] is not None:
+		key, action = forward[key]
+		actions.append(action)
+	actions.reverse()
+	key = meeting
+	while backward[key] is not None:
+		key, action = backward[key]
+		actions.append(action)
+	return actions
+
+def independence_detection(problem: SimpleSearchProblem) -> Optional[Solution]:
+	"""
+	Simple independence detection (Standley): every agent is first planned alone with A*, then any two groups of
+	agents whose plans conflict are merged and planned jointly, until the plans of all groups are compatible.
+	Independent agents are never searched in the joint space.
+
+	Groups are planned on the restricted GridModel, where the lasers of the other agents are never blocked: without
+	lasers the plan is as short as a joint BFS, with them it may be longer since no group relies on another to block
+	a beam. If a group has no plan on its own, all the agents are planned together. Only for SimpleSearchProblem,
+	other problems raise ValueError.
+	"""
+	if not isinstance(problem, SimpleSearchProblem):
+		raise ValueError(f"independence_detection needs goals on the exits only, which {type(problem).__name__} does not have")
+	model = problem.grid_model()
+	start = problem.encoder.unpack(problem.encode(problem.initial_state))[0]
+	everyone = tuple(range(len(start)))
+	groups = [(agent,) for agent in everyone]
+	plans = {group: _plan_group(problem, model, group, start) for group in groups}
+	if any(plan is None for plan in plans.values()):
+		groups = [everyone]
+		plans = {everyone: _plan_group(problem, model, everyone, start)}
+	while len(groups) > 1:
+		conflict = next(((g1, g2) for i, g1 in enumerate(groups) for g2 in groups[i + 1:] if _conflict(model, g1, g2, plans, start)), None)
+		if conflict is None: break
+		merged = tuple(sorted(conflict[0] + conflict[1]))
+		groups = [group for group in groups if group not in conflict] + [merged]
+		plans[merged] = _plan_group(problem, model, merged, start)
+		if plans[merged] is None:
+			groups = [everyone]
+			plans[everyone] = _plan_group(problem, model, everyone, start)
+	if plans[groups[0]] is None:
+		return None
+	return Solution(actions=_merge_plans(groups, plans, len(everyone)))
+
+def _plan_group(
+	problem: SimpleSearchProblem,
+	model: GridModel,
+	group: tuple[int, ...],
+	start: tuple[int, ...],
+) -> Optional[list[tuple[Action]]]:
+	"""Shortest plan bringing every agent of the group on an exit, on the model restricted to the group"""
+	model = model.restricted(group)
+	encoder = model.encoder
+	distances = problem.distances
+
+	def h(key: int) -> float:
+		return max(distances.to_nearest_exit(encoder.position(cell)) for cell in encoder.unpack(key)[0])
+
+	key = encoder.pack(start[agent] for agent in group)
+	queue = PriorityQueue()
+	queue.push(key, h(key))
+	parents = {key: None}
+	costs = {key: 0}
+	closed = set()
+	while not queue.is_empty():
+		key = queue.pop()
+		if key in closed: continue
+		closed.add(key)
+		cells = encoder.unpack(key)[0]
+		if model.is_dead(cells): continue
+		if all(cell in model.exits for cell in cells):
+			actions = []
+			while parents[key] is not None:
+				key, action = parents[key]
+				actions.append(action)
+			return list(reversed(actions))
+		problem.nodes_expanded += 1
+		for new_key, action, _ in model.successors(key):
+			problem.successors_generated += 1
+			new_key &= encoder.agents_mask
+			cost = costs[key] + 1
+			if new_key in costs and costs[new_key] <= cost: continue
+			costs[new_key] = cost
+			parents[new_key] = (key, action)
+			queue.push(new_key, cost + h(new_key))
+	return None
+
+def _merge_plans(groups: list[tuple[int, ...]], plans: dict, n_agents: int) -> list[tuple[Action]]:
+	"""The joint actions of the plans of the groups, the agents of a group whose plan is over staying on their exit"""
+	length = max(len(plans[group]) for group in groups)
+	actions = []
+	for t in range(length):
+		joint_action = [Action.STAY] * n_agents
+		for group in groups:
+			if t < len(plans[group]):
+				for agent, action in zip(group, plans[group][t]):
+					joint_action[agent] = action
+		actions.append(tuple(joint_action))
+	return actions
+
+def _conflict(model: GridModel, group1: tuple[int, ...], group2: tuple[int, ...], plans: dict, start: tuple[int, ...]) -> bool:
+	"""Whether playing the plans of both groups together differs from playing each one alone"""
+	expected = [_trajectory(model, group, plans[group], start) for group in (group1, group2)]
+	agents = group1 + group2
+	local = [tuple(range(len(group1))), tuple(range(len(group1), len(agents)))]
+	joint = model.restricted(agents)
+	key = joint.encoder.pack(start[agent] for agent in agents)
+	for t, joint_action in enumerate(_merge_plans(local, {local[0]: plans[group1], local[1]: plans[group2]}, len(agents))):
+		available = joint.available_actions(joint.encoder.unpack(key)[0])
+		if any(action not in actions for action, actions in zip(joint_action, available)):
+			return True
+		key = joint.step(key, joint_action)[0] & joint.encoder.agents_mask
+		cells = joint.encoder.unpack(key)[0]
+		if joint.is_dead(cells):
+			return True
+		for trajectory, group in zip(expected, local):
+			if tuple(cells[i] for i in group) != trajectory[min(t + 1, len(trajectory) - 1)]:
+				return True
+	return False
+
+def _trajectory(model: GridModel, group: tuple[int, ...], plan: list[tuple[Action]], start: tuple[int, ...]) -> list[tuple[int, ...]]:
+	"""The cells of the agents of the group at every step of its plan, played alone"""
+	model = model.restricted(group)
+	key = model.encoder.pack(start[agent] for agent in group)
+	trajectory = [model.encoder.unpack(key)[0]]
+	for joint_action in plan:
+		key = model.step(key, joint_action)[0]
+		trajectory.append(model.encoder.unpack(key)[0])
+	return trajectory
+
 def astar(problem: SearchProblem) -> Optional[Solution]:
 	return search(problem, Heap)
+
+def weighted_astar(problem: SearchProblem, weight: float = 2.0) -> Optional[Solution]:
+	"""
+	A* with the heuristic inflated by weight: fewer expansions, and with an admissible heuristic a plan at most weight
+	times the optimal cost
+	"""
+	return search(problem, Heap, weight)
+
+def od_astar(problem: SearchProblem) -> Optional[Solution]:
+	"""
+	A* with operator decomposition (Standley): the joint action is chosen one agent at a time, through intermediate
+	nodes, so that an expansion generates a node per action of the next agent instead of every joint action.
+
+	An intermediate node is bounded by g + h of the state where the agents assigned so far stand on their targets
+	(and by the f of its parent). With unit step costs and a heuristic that drops by at most one per step, this
+	never overestimates, so the plans are as short as those of astar. Runs on the GridModel of the problem, or a new one.
+	Raises ValueError if the problem does not have unit costs (see SearchProblem.admissible), as the bound is then wrong.
+	"""
+	if not problem.admissible:
+		raise ValueError(f"od_astar needs unit step costs and an admissible heuristic, which {type(problem).__name__} does not have")
+	model = problem.grid_model()
+	encoder = problem.encoder
+	key = problem.encode(problem.initial_state)
+	root = Node(None, problem.initial_state, None, 0, problem.heuristic(problem.initial_state), key)
+	# Entries are (node, actions of the agents assigned so far, available actions in the node), deepest first among ties
+	queue = PriorityQueue()
+	queue.push((root, (), None), (root.priority, 0))
+	visited = {key: 0}
+	while not queue.is_empty():
+		node, partial, available = queue.pop()
+		cells, gems, extra = encoder.unpack(node.key)
+		if not partial:
+			# A node reached again with a lower cost stays in the queue and is skipped
+			if visited[node.key] < node.cost: continue
+			if problem.is_goal_state(node.state):
+				return Solution(actions=node.get_actions())
+			if model.is_done(node.key): continue
+			problem.nodes_expanded += 1
+			available = model.available_actions(cells)
+		for action in available[len(partial)]:
+			joint_action = partial + (action,)
+			problem.successors_generated += 1
+			if len(joint_action) < len(cells):
+				moved = [model.moves[cell][action.value] for cell, action in zip(cells, joint_action)]
+				virtual = problem.from_key(node.state, encoder.pack(moved + list(cells[len(moved):]), gems, extra))
+				f = max(node.priority, node.cost + problem.heuristic(virtual))
+				if f < inf:
+					queue.push((node, joint_action, available), (f, -len(joint_action)))
+				continue
+			new_key, reward = model.step(node.key, joint_action)
+			state = problem.from_key(node.state, new_key)
+			key = problem.encode(state)
+			g = node.cost + problem.g(state, reward)
+			if key in visited and visited[key] <= g: continue
+			visited[key] = g
+			child = Node(node, state, joint_action, g, g + problem.heuristic(state), key)
+			queue.push((child, (), None), (child.priority, 0))
+	return None
+
+def jps(problem: SearchProblem) -> Optional[Solution]:
+	"""
+	Jump Point Search for one agent on a 4-connected grid: A* on the jump points only, skipping the cells of the
+	straight runs between them. Paths are horizontal first, a vertical run turning only where a wall ends beside it.
+
+	Only for a SimpleSearchProblem with one agent and neither lasers nor gems, since their rewards change the costs:
+	any other problem is solved by astar.
+	"""
+	world = problem.world
+	if not isinstance(problem, SimpleSearchProblem) or world.n_agents != 1 or world.laser_sources or world.n_gems > 0:
+		return astar(problem)
+	walkable = problem.distances.walkable
+	exits = set(world.exit_pos)
+
+	def jump_vertical(i: int, j: int, di: int) -> Optional[tuple[int, int]]:
+		while True:
+			i += di
+			if not walkable((i, j)): return None
+			if (i, j) in exits: return (i, j)
+			for dj in (-1, 1):
+				if walkable((i, j + dj)) and not walkable((i - di, j + dj)):
+					return (i, j)
+
+	def jump_horizontal(i: int, j: int, dj: int) -> Optional[tuple[int, int]]:
+		while True:
+			j += dj
+			if not walkable((i, j)): return None
+			if (i, j) in exits: return (i, j)
+			if jump_vertical(i, j, -1) is not None or jump_vertical(i, j, 1) is not None:
+				return (i, j)
+
+	def successors(pos: tuple[int, int], direction: Optional[tuple[int, int]]):
+		i, j = pos
+		if direction is None:
+			directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+		elif direction[0] == 0:
+			directions = [direction, (-1, 0), (1, 0)]
+		else:
+			di = direction[0]
+			directions = [direction] + [(0, dj) for dj in (-1, 1) if walkable((i, j + dj)) and not walkable((i - di, j + dj))]
+		for di, dj in directions:
+			target = jump_horizontal(i, j, dj) if di == 0 else jump_vertical(i, j, di)
+			if target is not None:
+				yield target, (di, dj)
+
+	start = tuple(problem.initial_state.agents_positions[0])
+	queue = PriorityQueue()
+	queue.push((start, None), problem.distances.to_nearest_exit(start))
+	costs = {start: 0}
+	parents = {start: None}
+	while not queue.is_empty():
+		pos, direction = queue.pop()
+		if pos in exits:
+			return Solution(actions=_straight_runs(pos, parents))
+		problem.nodes_expanded += 1
+		for target, new_direction in successors(pos, direction):
+			problem.successors_generated += 1
+			cost = costs[pos] + abs(target[0] - pos[0]) + abs(target[1] - pos[1])
+			if target in costs and costs[target] <= cost: continue
+			costs[target] = cost
+			parents[target] = pos
+			queue.push((target, new_direction), cost + problem.distances.to_nearest_exit(target))
+	return None
+
+_DIRECTION_ACTIONS = {(-1, 0): Action.NORTH, (1, 0): Action.SOUTH, (0, 1): Action.EAST, (0, -1): Action.WEST}
+
+def _straight_runs(pos: tuple[int, int], parents: dict) -> list[tuple[Action]]:
+	"""The actions from the start to pos, walking straight between consecutive jump points"""
+	actions = []
+	while parents[pos] is not None:
+		parent = parents[pos]
+		length = abs(pos[0] - parent[0]) + abs(pos[1] - parent[1])
+		direction = ((pos[0] - parent[0]) // length, (pos[1] - parent[1]) // length)
+		actions.extend([(_DIRECTION_ACTIONS[direction],)] * length)
+		pos = parent
+	return list(reversed(actions))
+
+def astar_buckets(problem: SearchProblem) -> Optional[Solution]:
+	"""
+	A* with a Bucket frontier, for integer costs. Raises ValueError if the heuristic of the problem is not admissible
+	(see SearchProblem.admissible): the plan would then depend on how ties are broken and could be longer than with astar.
+	"""
+	if not problem.admissible:
+		raise ValueError(f"astar_buckets needs an admissible heuristic, which {type(problem).__name__} does not have")
+	return search(problem, Bucket)
+
+def ida_star(problem: SearchProblem, max_nodes: Optional[int] = None, table_size: int = 100_000) -> Optional[Solution]:
+	"""
+	Iterative deepening A*: depth-first searches bounded by f, the bound growing to the smallest f that exceeded it.
+	Keeps the current path and a transposition table of at most table_size states (the least recently used evicted).
+
+	Returns None if there is no solution, or once max_nodes nodes were expanded without finding one.
+	"""
+	start = problem.initial_state
+	if problem.is_goal_state(start):
+		return Solution(actions=[])
+	threshold = problem.heuristic(start)
+	first = problem.nodes_expanded
+	while threshold < inf:
+		# Lowest f, with its g, of the states cut by the bound. Once the table is full, only the lowest f is kept
+		frontier = {}
+		overflow = inf
+		path = [problem.encode(start)]
+		on_path = set(path)
+		table = LRUCache(table_size)
+		table.put(path[0], 0)
+		costs = [0]
+		actions = []
+		stack = [iter(list(problem.get_successors(start)))]
+		while stack:
+			successor = next(stack[-1], None)
+			if successor is None:
+				stack.pop()
+				on_path.discard(path.pop())
+				costs.pop()
+				if actions: actions.pop()
+				continue
+			state, action, cost = successor
+			key = problem.encode(state)
+			if key in on_path: continue
+			g = costs[-1] + problem.g(state, cost)
+			f = g + problem.heuristic(state)
+			if f > threshold:
+				if key in frontier:
+					frontier[key] = min(frontier[key], (f, g))
+				elif len(frontier) < table_size:
+					frontier[key] = (f, g)
+				else:
+					overflow = min(overflow, f)
+				continue
+			# Lowest g of the state in this iteration: its first visit explored everything below it within the bound
+			best = table.get(key)
+			if best is not None and best <= g: continue
+			table.put(key, g)
+			actions.append(action)
+			if problem.is_goal_state(state):
+				return Solution(actions=actions)
+			if max_nodes is not None and problem.nodes_expanded - first >= max_nodes:
+				return None
+			path.append(key)
+			on_path.add(key)
+			costs.append(g)
+			stack.append(iter(list(problem.get_successors(state))))
+		# A state cut by the bound but reached within it at a g as low does not need a larger bound, so the
+		# search ends once every reachable state was explored
+		threshold = overflow
+		for key, (f, g) in frontier.items():
+			best = table.get(key)
+			if best is None or best > g:
+				threshold = min(threshold, f)
+	return None
+
+def sma_star(problem: SearchProblem, max_nodes: int = 100_000, table_size: int = 100_000) -> Optional[Solution]:
+	"""
+	Simplified memory-bounded A*: A* on a tree of at most max_nodes nodes, with a transposition table of at most
+	table_size states (the least recently used evicted).
+
+	Returns None if there is no solution, or if none fits in max_nodes nodes (plans longer than max_nodes - 1 steps).
+	"""
+	if max_nodes < 1:
+		raise ValueError(f"sma_star needs room for at least one node, got max_nodes={max_nodes}")
+	root = MemoryNode(None, problem.initial_state, None, 0, problem.heuristic(problem.initial_state), problem.encode(problem.initial_state))
+	# Nodes that can still give something, deepest first among the lowest next f
+	queue = IndexedPriorityQueue()
+	# Nodes without children in memory, shallowest first among the highest f
+	leaves = IndexedPriorityQueue()
+	n_nodes = 1
+	table = LRUCache(table_size)
+	table.put(root.key, (0, None))
+
+	def refresh(node: MemoryNode):
+		next_f = node.next_f()
+		if next_f < inf:
+			queue.push(node, (next_f, -node.depth))
+		elif node in queue:
+			queue.remove(node)
+		if node.parent is not None and not node.children:
+			leaves.push(node, (-node.priority, node.depth))
+		elif node in leaves:
+			leaves.remove(node)
+
+	def back_up(node: MemoryNode):
+		while node is not None:
+			refresh(node)
+			f = node.backed_up_f()
+			if f == node.priority: break
+			node.priority = f
+			refresh(node)
+			node = node.parent
+
+	refresh(root)
+	while not queue.is_empty():
+		node = queue.peek()
+		if not node.expanded:
+			if problem.is_goal_state(node.state):
+				return Solution(actions=node.get_actions())
+			node.expanded = True
+			for i, (state, action, cost) in enumerate(problem.get_successors(node.state)):
+				key = problem.encode(state)
+				if node.depth + 1 >= max_nodes or node.on_path(key): continue
+				g = node.cost + problem.g(state, cost)
+				# The table keeps the lowest g of each state and the parent it was first reached from with it. States
+				# reached before at a lower g, or at the same g from another parent, are pruned. A node expanded again
+				# after being forgotten reaches its successors from the same parent at the same g, so they are kept
+				best = table.get(key)
+				if best is not None and (best[0] < g or best[0] == g and best[1] != node.key): continue
+				table.put(key, (g, node.key))
+				# pathmax keeps f from decreasing along a path
+				node.pending[i] = (max(node.priority, g + problem.heuristic(state)), state, action, g)
+			back_up(node)
+			continue
+		index = min(node.pending, key=lambda i: node.pending[i][0])
+		f, state, action, g = node.pending.pop(index)
+		child = MemoryNode(node, state, action, g, f, problem.encode(state), index)
+		node.children.append(child)
+		n_nodes += 1
+		refresh(child)
+		back_up(node)
+		if n_nodes > max_nodes:
+			# The shallowest leaf with the highest f is forgotten: its f backed up in its parent regenerates it when
+			# the rest of the tree looks worse
+			forgotten = leaves.pop()
+			parent = forgotten.parent
+			parent.children.remove(forgotten)
+			parent.pending[forgotten.index] = (forgotten.priority, forgotten.state, forgotten.action, forgotten.cost)
+			if forgotten in queue:
+				queue.remove(forgotten)
+			n_nodes -= 1
+			back_up(parent)
+	return None
+
+@dataclass
+class AnytimeSolution:
+	solution: Solution
+	cost: float
+	# Weight of the search which published the solution
+	weight: float
+	# The solution costs at most bound times the optimal cost, None if the heuristic of the problem is not admissible
+	bound: Optional[float]
+
+def ara_star(
+	problem: SearchProblem,
+	deadline: Optional[float] = None,
+	weight: float = 5.0,
+	decrement: float = 0.5,
+) -> Iterator[AnytimeSolution]:
+	"""
+	Anytime repairing A* (Likhachev et al.): a weighted A* with the given weight, then again with the weight lowered
+	by decrement down to 1. Each search starts from the g values and frontier of the previous one, only reopening the
+	states whose cost improved, so that the first solution comes quickly and the following ones cost little.
+
+	Yields a solution each time one is cheaper or proved closer to the optimal than the previous one, the last being
+	optimal if the heuristic is admissible. Stops after the search with weight 1 or once deadline seconds have passed.
+	"""
+	if weight < 1 or decrement <= 0:
+		raise ValueError(f"ara_star needs a weight of at least 1 and a positive decrement, got {weight} and {decrement}")
+	end = None if deadline is None else perf_counter() + deadline
+	key = problem.encode(problem.initial_state)
+	# Best node known for each state, and the heuristic of each state computed once for all the searches
+	nodes = {key: Node(None, problem.initial_state, None, 0, key=key)}
+	h = {key: problem.heuristic(problem.initial_state)}
+	incumbent = nodes[key] if problem.is_goal_state(problem.initial_state) else None
+	frontier = IndexedPriorityQueue()
+	frontier.push(key, weight * h[key])
+	# States whose cost improved after their expansion in the current search, reopened by the next one
+	inconsistent = set()
+	published: Optional[AnytimeSolution] = None
+	while True:
+		closed = set()
+		while not frontier.is_empty() and (incumbent is None or incumbent.cost > frontier.priority(frontier.peek())):
+			if end is not None and perf_counter() >= end:
+				return
+			key = frontier.pop()
+			closed.add(key)
+			node = nodes[key]
+			for state, action, cost in problem.get_successors(node.state):
+				key = problem.encode(state)
+				g = node.cost + problem.g(state, cost)
+				if key in nodes and nodes[key].cost <= g: continue
+				nodes[key] = Node(node, state, action, g, key=key)
+				if problem.is_goal_state(state):
+					if incumbent is None or g < incumbent.cost:
+						incumbent = nodes[key]
+				if key not in h:
+					h[key] = problem.heuristic(state)
+				if key in closed:
+					inconsistent.add(key)
+				else:
+					frontier.push(key, g + weight * h[key])
+		if incumbent is None:
+			return
+		bound = None
+		if problem.admissible:
+			lower = min((nodes[key].cost + h[key] for key in (*frontier.index, *inconsistent)), default=incumbent.cost)
+			bound = weight if lower <= 0 else max(1.0, min(weight, incumbent.cost / lower))
+		if published is None or incumbent.cost < published.cost or (bound is not None and bound < published.bound):
+			published = AnytimeSolution(Solution(actions=incumbent.get_actions()), incumbent.cost, weight, bound)
+			yield published
+		if weight <= 1:
+			return
+		weight = max(1.0, weight - decrement)
+		keys = [*frontier.index, *inconsistent]
+		frontier = IndexedPriorityQueue()
+		for key in keys:
+			frontier.push(key, nodes[key].cost + weight * h[key])
+		inconsistent = set()
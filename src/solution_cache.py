@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from importlib import metadata
+from time import time
+from typing import Callable, Optional
+from problem import SearchProblem
+from search import Solution, pack_action, unpack_action
+
+
+@dataclass
+class CachedSolution:
+	solution: Solution
+	nodes_expanded: int
+	successors_generated: int
+	# Duration of the search which found the solution, not of the lookup
+	time: float
+	hit: bool
+
+
+class SolutionCache:
+	"""
+	Solutions stored in an SQLite file, keyed by a hash of the map contents, the problem class and the algorithm,
+	with the statistics of the search which found them.
+
+	A hit is replayed on the problem before being returned, so that a stale or corrupted entry is never trusted:
+	such an entry is deleted and the map solved again.
+	"""
+
+	def __init__(self, path: str = ".solutions.sqlite"):
+		self.path = path
+		# Several solve.py workers may write at the same time: wait for the lock instead of failing
+		self._db = sqlite3.connect(path, timeout=30)
+		self._db.execute(
+			"CREATE TABLE IF NOT EXISTS solutions ("
+			"map TEXT, problem TEXT, algorithm TEXT, actions TEXT, nodes_expanded INTEGER, successors_generated INTEGER, time REAL, "
+			"PRIMARY KEY (map, problem, algorithm))"
+		)
+		self._db.commit()
+
+	def close(self):
+		self._db.close()
+
+	@staticmethod
+	def map_hash(map_file: str) -> str:
+		"""Hash of the contents of the map file. lle levels (e.g. level3) have no file and are keyed by name and lle version."""
+		if os.path.isfile(map_file):
+			with open(map_file, "rb") as file:
+				contents = file.read()
+		else:
+			contents = f"{map_file} lle {metadata.version('lle')}".encode()
+		return hashlib.sha256(contents).hexdigest()
+
+	def get(self, map_file: str, problem: SearchProblem, algorithm: str) -> Optional[CachedSolution]:
+		"""The stored solution if there is one and it still solves the problem, None otherwise"""
+		key = (self.map_hash(map_file), type(problem).__name__, algorithm)
+		row = self._db.execute(
+			"SELECT actions, nodes_expanded, successors_generated, time FROM solutions WHERE map = ? AND problem = ? AND algorithm = ?", key
+		).fetchone()
+		if row is None:
+			return None
+		actions, nodes_expanded, successors_generated, duration = row
+		try:
+			solution = Solution(actions=[unpack_action(code, problem.world.n_agents) for code in json.loads(actions)])
+		except TypeError:
+			# Stored by an older version, as lists of action values
+			solution = None
+		if solution is None or not _replay(problem, solution):
+			self._db.execute("DELETE FROM solutions WHERE map = ? AND problem = ? AND algorithm = ?", key)
+			self._db.commit()
+			return None
+		return CachedSolution(solution, nodes_expanded, successors_generated, duration, hit=True)
+
+	def put(self, map_file: str, problem: SearchProblem, algorithm: str, solution: Solution, duration: float):
+		"""Store the solution with the counters of the problem it was searched on"""
+		# Each joint action is stored packed by pack_action
+		actions = json.dumps([pack_action(joint_action) for joint_action in solution.actions])
+		self._db.execute(
+			"INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?)",
+			(
+				self.map_hash(map_file),
+				type(problem).__name__,
+				algorithm,
+				actions,
+				problem.nodes_expanded,
+				problem.successors_generated,
+				duration,
+			),
+		)
+		self._db.commit()
+
+	def solve(
+		self,
+		map_file: str,
+		problem: SearchProblem,
+		algorithm: str,
+		search: Callable[[SearchProblem], Optional[Solution]],
+	) -> Optional[CachedSolution]:
+		"""The stored solution, or the one found by search (then stored). Problems without solution are not stored."""
+		cached = self.get(map_file, problem, algorithm)
+		if cached is not None:
+			return cached
+		start = time()
+		solution = search(problem)
+		duration = time() - start
+		if solution is None:
+			return None
+		self.put(map_file, problem, algorithm, solution, duration)
+		return CachedSolution(solution, problem.nodes_expanded, problem.successors_generated, duration, hit=False)
+
+
+def _replay(problem: SearchProblem, solution: Solution) -> bool:
+	"""Whether stepping the World through the actions reaches a goal state of the problem"""
+	world = problem.world
+	state = problem.initial_state
+	try:
+		for joint_action in solution.actions:
+			problem.set_state(state)
+			available = world.available_actions()
+			if world.done or len(joint_action) != len(available):
+				return False
+			if any(action not in actions for action, actions in zip(joint_action, available)):
+				return False
+			world.step(joint_action)
+			state = problem.get_state(state)
+		return problem.is_goal_state(state)
+	finally:
+		world.reset()
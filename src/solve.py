@@ -0,0 +1,129 @@
+"""
+Solve maps in batch on all cores and stream one JSON line per (map, problem, algorithm) job, e.g.
+
+	python src/solve.py "cartes/**" "level*" --problems simple gems --algorithms bfs astar --timeout 60
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fnmatch import fnmatchcase
+from glob import glob
+from itertools import product
+from time import time
+from typing import Iterable, Optional
+from lle import World
+from portfolio import PROBLEMS, ALGORITHMS
+from solution_cache import CachedSolution, SolutionCache
+
+
+class JobTimeout(Exception):
+	"""Raised in a worker when its job runs out of time"""
+
+
+# Extensions of map files: those of cartes/ have none, other files matched (e.g. the level*.png pictures) are skipped
+MAP_EXTENSIONS = ("", ".txt", ".toml")
+# Levels shipped with lle, loaded by World.from_file from their name
+LEVELS = [f"level{i}" for i in range(1, 7)]
+
+
+def expand_maps(patterns: Iterable[str]) -> list[str]:
+	"""
+	The map files matched by the glob patterns, in order. A pattern matching no map file is matched against the lle
+	levels (level* gives level1 to level6), and kept as is if it matches none of them either.
+	"""
+	maps = []
+	for pattern in patterns:
+		matches = sorted(
+			path for path in glob(pattern, recursive=True) if os.path.isfile(path) and os.path.splitext(path)[1] in MAP_EXTENSIONS
+		)
+		maps.extend(matches or [level for level in LEVELS if fnmatchcase(level, pattern)] or [pattern])
+	return list(dict.fromkeys(maps))
+
+
+def run_job(map_file: str, problem_name: str, algorithm: str, timeout: Optional[float] = None, cache: Optional[str] = None) -> dict:
+	"""
+	Solve one map and describe the outcome, whose status is solved, no_solution, timeout or error.
+	With a cache (path of a SolutionCache), a stored solution is replayed instead of searched, and cached is true.
+	"""
+	result = {"map": map_file, "problem": problem_name, "algorithm": algorithm}
+	problem = None
+	cached: Optional[CachedSolution] = None
+	steps = None
+	start = time()
+	if timeout is not None:
+		signal.signal(signal.SIGALRM, _on_alarm)
+		signal.setitimer(signal.ITIMER_REAL, timeout)
+	try:
+		problem = PROBLEMS[problem_name](World.from_file(map_file))
+		if cache is None:
+			solution = ALGORITHMS[algorithm](problem)
+		else:
+			solutions = SolutionCache(cache)
+			try:
+				cached = solutions.solve(map_file, problem, algorithm, ALGORITHMS[algorithm])
+			finally:
+				solutions.close()
+			solution = None if cached is None else cached.solution
+		status = "no_solution" if solution is None else "solved"
+		steps = None if solution is None else solution.n_steps
+	except JobTimeout:
+		status = "timeout"
+	except Exception as error:
+		status = "error"
+		result["error"] = repr(error)
+	finally:
+		if timeout is not None:
+			signal.setitimer(signal.ITIMER_REAL, 0)
+	# On a cache hit, the counters are those of the search which found the solution
+	counters = problem if cached is None else cached
+	result.update(
+		status=status,
+		steps=steps,
+		nodes_expanded=None if counters is None else counters.nodes_expanded,
+		successors_generated=None if counters is None else counters.successors_generated,
+		time=time() - start,
+	)
+	if cache is not None:
+		result["cached"] = cached is not None and cached.hit
+	return result
+
+
+def _on_alarm(signum, frame):
+	raise JobTimeout()
+
+
+def main(argv: Optional[list[str]] = None):
+	parser = argparse.ArgumentParser(description="Solve every (map, problem, algorithm) combination and print one JSON line per job")
+	parser.add_argument("maps", nargs="+", help="map files, glob patterns (** is recursive) or lle level names")
+	parser.add_argument("--problems", nargs="+", choices=list(PROBLEMS), default=["simple"])
+	parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=["astar"])
+	parser.add_argument("--timeout", type=float, default=None, help="time limit of each job in seconds")
+	parser.add_argument("--workers", type=int, default=None, help="number of processes (all cores by default)")
+	parser.add_argument("--output", default=None, help="write the JSON lines to this file instead of stdout")
+	parser.add_argument("--cache", default=None, help="SQLite file of solutions reused across runs (replayed before being trusted)")
+	args = parser.parse_args(argv)
+
+	jobs = list(product(expand_maps(args.maps), args.problems, args.algorithms))
+	output = sys.stdout if args.output is None else open(args.output, "w")
+	try:
+		with ProcessPoolExecutor(max_workers=args.workers) as executor:
+			futures = {executor.submit(run_job, *job, args.timeout, args.cache): job for job in jobs}
+			for future in as_completed(futures):
+				try:
+					result = future.result()
+				except Exception as error:
+					# The worker process itself died (e.g. out of memory)
+					map_file, problem_name, algorithm = futures[future]
+					result = {"map": map_file, "problem": problem_name, "algorithm": algorithm, "status": "error", "error": repr(error)}
+				output.write(json.dumps(result) + "\n")
+				output.flush()
+	finally:
+		if output is not sys.stdout:
+			output.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,41 @@
+import pytest
+from lle import World
+from problem import SimpleSearchProblem, GemSearchProblem
+from search import astar, ara_star
+
+from .utils import check_world_done
+
+
+def test_improves_to_optimal():
+    world = World.from_file("cartes/gems")
+    expected = astar(GemSearchProblem(world))
+    problem = GemSearchProblem(world)
+    solutions = list(ara_star(problem, weight=5))
+    assert solutions[0].weight == 5
+    assert solutions[-1].solution.n_steps == expected.n_steps
+    assert solutions[-1].bound == 1
+    for previous, solution in zip(solutions, solutions[1:]):
+        assert solution.cost <= previous.cost
+        assert solution.bound <= previous.bound
+    for solution in solutions:
+        assert solution.cost <= solution.bound * expected.n_steps
+        check_world_done(problem, solution.solution)
+
+
+def test_no_bound_without_admissible_heuristic():
+    problem = SimpleSearchProblem(World.from_file("level3"))
+    solutions = list(ara_star(problem))
+    assert solutions
+    assert all(solution.bound is None for solution in solutions)
+    check_world_done(problem, solutions[-1].solution)
+
+
+def test_deadline():
+    problem = GemSearchProblem(World.from_file("cartes/gems"))
+    assert list(ara_star(problem, deadline=0)) == []
+    with pytest.raises(ValueError):
+        next(ara_star(problem, weight=0.5))
+
+
+def test_impossible():
+    assert list(ara_star(GemSearchProblem(World.from_file("cartes/2_agents/impossible")))) == []
@@ -1,5 +1,5 @@
 from lle import World, Action
-from search import astar
+from search import astar, weighted_astar
 from problem import SimpleSearchProblem
 
 from .utils import check_world_done
@@ -80,3 +80,13 @@ def test_level3():
     problem = SimpleSearchProblem(world)
     solution = astar(problem)
     check_world_done(problem, solution)
+
+
+def test_weighted():
+    world = World.from_file("cartes/2_agents/zigzag")
+    expected = SimpleSearchProblem(world)
+    astar(expected)
+    problem = SimpleSearchProblem(world)
+    solution = weighted_astar(problem, 5)
+    assert problem.nodes_expanded <= expected.nodes_expanded
+    check_world_done(problem, solution)
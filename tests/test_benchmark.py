@@ -0,0 +1,55 @@
+from benchmark import run, compare
+
+
+def result(status="solved", steps=10, nodes_expanded=100, time=1.0, peak_rss=1000):
+    return {
+        "map": "level3",
+        "problem": "simple",
+        "algorithm": "astar",
+        "status": status,
+        "steps": steps,
+        "nodes_expanded": nodes_expanded,
+        "time": time,
+        "peak_rss": peak_rss,
+    }
+
+
+def test_run():
+    results = run(["cartes/1_agent/zigzag"], ["simple"], ["bfs", "astar"], repetitions=2)
+    assert len(results["results"]) == 2
+    for measure in results["results"]:
+        assert measure["status"] == "solved"
+        assert measure["steps"] == 19
+        assert measure["successors_generated"] >= measure["nodes_expanded"] > 0
+        assert len(measure["times"]) == 2
+        assert measure["peak_rss"] > 0
+        assert measure["bytes_per_node"] >= 0
+
+
+def test_bucket_frontier():
+    results = run(["cartes/1_agent/zigzag"], ["gems", "simple"], ["astar", "astar_buckets"], repetitions=1)
+    gems_heap, gems_bucket, simple_heap, simple_bucket = results["results"]
+    assert gems_bucket["status"] == gems_heap["status"] == "solved"
+    assert gems_bucket["steps"] == gems_heap["steps"]
+    assert simple_bucket["status"] == "error"
+
+
+def test_compare():
+    baseline = {"results": [result()]}
+    assert compare(baseline, {"results": [result(time=1.1, peak_rss=1100)]}) == []
+    assert len(compare(baseline, {"results": [result(steps=11, nodes_expanded=200)]})) == 2
+    assert len(compare(baseline, {"results": [result(time=2.0)]})) == 1
+    assert len(compare(baseline, {"results": [result(status="timeout")]})) == 1
+
+
+def test_compare_unsolved_baseline():
+    # A map which timed out before has no steps to compare with: solving it is no regression
+    for status in ["timeout", "error", "no_solution"]:
+        baseline = {"results": [result(status=status, steps=None, time=60.0)]}
+        assert compare(baseline, {"results": [result()]}) == []
+        assert compare(baseline, {"results": [result(status="timeout")]}) == []
+
+
+def test_compare_ignores_noise():
+    baseline = {"results": [result(time=0.001)]}
+    assert compare(baseline, {"results": [result(time=0.01)]}) == []
@@ -0,0 +1,36 @@
+import pytest
+from lle import World
+from problem import SimpleSearchProblem, GemSearchProblem
+from search import bfs, bidirectional_bfs
+
+from .utils import check_world_done
+
+
+def test_same_length_as_bfs():
+    for map_file in ["cartes/1_agent/vide", "cartes/1_agent/zigzag", "cartes/2_agents/vide", "cartes/2_agents/zigzag", "level3"]:
+        world = World.from_file(map_file)
+        expected = bfs(SimpleSearchProblem(world))
+        problem = SimpleSearchProblem(world)
+        solution = bidirectional_bfs(problem)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_fewer_expansions_than_bfs():
+    world = World.from_file("level3")
+    expected = SimpleSearchProblem(world)
+    bfs(expected)
+    problem = SimpleSearchProblem(world)
+    bidirectional_bfs(problem)
+    assert problem.nodes_expanded < expected.nodes_expanded
+
+
+def test_impossible():
+    for map_file in ["cartes/1_agent/impossible", "cartes/2_agents/impossible"]:
+        problem = SimpleSearchProblem(World.from_file(map_file))
+        assert bidirectional_bfs(problem) is None
+
+
+def test_goals_must_be_known():
+    with pytest.raises(ValueError):
+        bidirectional_bfs(GemSearchProblem(World.from_file("cartes/gems")))
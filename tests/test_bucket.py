@@ -0,0 +1,34 @@
+import pytest
+from lle import World
+from problem import SimpleSearchProblem, GemSearchProblem
+from search import astar, astar_buckets
+
+from .utils import check_world_done
+
+
+def test_same_length_as_heap():
+    for map_file in ["cartes/1_agent/zigzag", "cartes/2_agents/zigzag", "level3", "cartes/gems"]:
+        world = World.from_file(map_file)
+        expected = astar(GemSearchProblem(world))
+        problem = GemSearchProblem(world)
+        solution = astar_buckets(problem)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_inadmissible_heuristic():
+    world = World.from_file("cartes/1_agent/vide")
+    problem = SimpleSearchProblem(world)
+    solution = astar(problem)
+    world.reset()
+    cost = sum(1 - world.step(action) for action in solution.actions)
+    assert problem.heuristic(problem.initial_state) == solution.n_steps == 8 > cost == 6
+    with pytest.raises(ValueError):
+        astar_buckets(problem)
+
+
+def test_impossible():
+    world = World.from_file("cartes/2_agents/impossible")
+    problem = GemSearchProblem(world)
+    assert astar_buckets(problem) is None
+    assert problem.nodes_expanded > 0
@@ -0,0 +1,70 @@
+import resource
+from lle import World
+from instrumentation import SearchMonitor
+from problem import SimpleSearchProblem, GemSearchProblem
+from search import astar, search, SearchRun, BudgetExceeded, Heap, Queue, Solution
+
+from .utils import check_world_done
+
+
+def test_same_solution_as_search():
+    world = World.from_file("cartes/gems")
+    expected = astar(GemSearchProblem(world))
+    problem = GemSearchProblem(world)
+    run = SearchRun(problem, Heap, every=10)
+    snapshots = list(run)
+    assert isinstance(run.result, Solution)
+    assert run.result.n_steps == expected.n_steps
+    assert [progress.expanded for progress in snapshots] == [10 * (i + 1) for i in range(len(snapshots))]
+    assert all(progress.frontier_size > 0 for progress in snapshots)
+    check_world_done(problem, run.result)
+
+
+def test_expansions_budget():
+    problem = SimpleSearchProblem(World.from_file("cartes/2_agents/impossible"))
+    result = SearchRun(problem, Queue, max_expansions=20).run()
+    assert isinstance(result, BudgetExceeded)
+    assert result.reason == "expansions"
+    assert result.progress.expanded == 20
+
+
+def test_budget_just_enough():
+    world = World.from_file("cartes/1_agent/vide")
+    monitor = SearchMonitor()
+    expected = search(GemSearchProblem(world), Heap, monitor=monitor)
+    assert SearchRun(GemSearchProblem(world), Heap, max_expansions=monitor.expanded).run() == expected
+    assert SearchRun(GemSearchProblem(world), Heap, max_expansions=monitor.expanded - 1).run().reason == "expansions"
+
+
+def test_time_and_memory_budgets():
+    world = World.from_file("level3")
+    assert SearchRun(SimpleSearchProblem(world), Queue, max_time=0).run().reason == "time"
+    assert SearchRun(SimpleSearchProblem(world), Queue, max_memory=1, every=1).run().reason == "memory"
+
+
+def test_memory_budget_ignores_freed_memory():
+    # The peak RSS of the process includes this block, the memory it holds while searching does not
+    block = bytearray(200 << 20)
+    del block
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    result = SearchRun(GemSearchProblem(World.from_file("cartes/gems")), Heap, max_memory=peak, max_expansions=200, every=1).run()
+    assert result.reason == "expansions"
+
+
+def test_cancel():
+    world = World.from_file("level3")
+    run = SearchRun(SimpleSearchProblem(world), Queue, every=1)
+    for progress in run:
+        if progress.expanded == 3:
+            run.cancel()
+    assert run.result.reason == "cancelled"
+    assert run.result.progress.expanded == 3
+    run = SearchRun(SimpleSearchProblem(world), Queue, every=1)
+    for progress in run:
+        break
+    assert (run.result.reason, run.result.progress.expanded) == ("cancelled", progress.expanded)
+
+
+def test_no_solution():
+    run = SearchRun(SimpleSearchProblem(World.from_file("cartes/2_agents/impossible")), Queue)
+    assert run.run() is None
@@ -0,0 +1,30 @@
+from lle import World
+from distances import DistanceOracle
+
+
+def test_zigzag_distance_to_exit():
+    world = World.from_file("cartes/1_agent/zigzag")
+    oracle = DistanceOracle.of(world)
+    assert oracle.to_nearest_exit((2, 0)) == 19
+    assert oracle.distance((2, 0), (0, 9)) == 19
+
+
+def test_unreachable_exit():
+    world = World.from_file("cartes/1_agent/impossible")
+    oracle = DistanceOracle.of(world)
+    assert oracle.to_nearest_exit((0, 0)) == float("inf")
+
+
+def test_oracle_is_cached_per_map():
+    world1 = World.from_file("cartes/corners")
+    world2 = World.from_file("cartes/corners")
+    assert DistanceOracle.of(world1) is DistanceOracle.of(world2)
+
+
+def test_never_below_manhattan():
+    world = World.from_file("cartes/corners")
+    oracle = DistanceOracle.of(world)
+    for i in range(world.height):
+        for j in range(world.width):
+            if oracle.walkable((i, j)):
+                assert oracle.distance((i, j), (0, 0)) >= i + j
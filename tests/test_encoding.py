@@ -0,0 +1,32 @@
+from lle import World
+from encoding import StateEncoder
+from problem import CornerSearchProblem, GemSearchProblem, SimpleSearchProblem
+
+
+def test_round_trip():
+    world = World.from_file("cartes/gems")
+    encoder = StateEncoder(world)
+    world.reset()
+    state = world.get_state()
+    key = encoder.encode(state, 0b101)
+    decoded, extra = encoder.decode(key)
+    assert extra == 0b101
+    assert list(decoded.agents_positions) == list(state.agents_positions)
+    assert list(decoded.gems_collected) == list(state.gems_collected)
+
+
+def test_distinct_successors_have_distinct_keys():
+    world = World.from_file("cartes/2_agents/vide")
+    problem = SimpleSearchProblem(world)
+    successors = list(problem.get_successors(problem.initial_state))
+    keys = {problem.encode(state) for state, _, _ in successors}
+    # Several joint actions may lead to the same state (e.g. both agents blocked)
+    positions = {tuple(state.agents_positions) for state, _, _ in successors}
+    assert len(keys) == len(positions)
+
+
+def test_problem_decode():
+    for Problem in (CornerSearchProblem, GemSearchProblem):
+        problem = Problem(World.from_file("cartes/gems"))
+        for state, _, _ in problem.get_successors(problem.initial_state):
+            assert problem.decode(problem.encode(state)) == state
@@ -0,0 +1,38 @@
+import os
+from lle import World
+from problem import SimpleSearchProblem, CornerSearchProblem, GemSearchProblem
+from search import bfs
+from external_search import external_bfs
+
+from .utils import check_world_done
+
+
+def test_same_length_as_bfs():
+    for map_file in ["cartes/1_agent/zigzag", "cartes/2_agents/zigzag", "level3"]:
+        world = World.from_file(map_file)
+        expected = bfs(SimpleSearchProblem(world))
+        problem = SimpleSearchProblem(world)
+        solution = external_bfs(problem)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_small_batches(tmp_path):
+    world = World.from_file("cartes/small_gems")
+    expected = bfs(GemSearchProblem(world))
+    problem = GemSearchProblem(world)
+    solution = external_bfs(problem, directory=str(tmp_path), batch_size=3)
+    assert solution.n_steps == expected.n_steps
+    check_world_done(problem, solution)
+    assert os.listdir(tmp_path) == []
+
+
+def test_corners():
+    world = World.from_file("cartes/small_corners")
+    expected = bfs(CornerSearchProblem(world, native=True))
+    assert external_bfs(CornerSearchProblem(world, native=True), batch_size=1000).n_steps == expected.n_steps
+
+
+def test_impossible():
+    for map_file in ["cartes/1_agent/impossible", "cartes/2_agents/impossible"]:
+        assert external_bfs(SimpleSearchProblem(World.from_file(map_file))) is None
@@ -0,0 +1,36 @@
+from lle import Action
+from search import Stack, Queue, Node, NodeStore, CompactNode
+
+
+def test_stack_order():
+    frontier = Stack()
+    frontier.push(0)
+    frontier.push_many([1, 2, 3])
+    assert len(frontier) == 4
+    assert [frontier.pop() for _ in range(4)] == [3, 2, 1, 0]
+    assert frontier.is_empty()
+
+
+def test_queue_order():
+    frontier = Queue()
+    frontier.push(0)
+    frontier.push_many([1, 2, 3])
+    assert len(frontier) == 4
+    assert [frontier.pop() for _ in range(4)] == [0, 1, 2, 3]
+    assert frontier.is_empty()
+
+
+def test_node_store_actions():
+    store = NodeStore()
+    root = store.add(-1, None)
+    first = store.add(root, (Action.EAST, Action.STAY))
+    second = store.add(first, (Action.NORTH, Action.WEST))
+    store.add(first, (Action.SOUTH, Action.SOUTH))
+    assert len(store) == 4
+    assert store.get_actions(root) == []
+    assert store.get_actions(second) == [(Action.EAST, Action.STAY), (Action.NORTH, Action.WEST)]
+
+
+def test_nodes_without_dict():
+    for node in (Node(None, None, None, 0), CompactNode(None, 0, 0, 0, NodeStore(), 0)):
+        assert not hasattr(node, "__dict__")
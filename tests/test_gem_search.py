@@ -1,6 +1,6 @@
 from lle import World
 from problem import GemSearchProblem
-from search import astar
+from search import astar, bfs
 
 from .utils import check_world_done
 
@@ -12,3 +12,26 @@ def test_gems_collected():
     check_world_done(problem, solution)
     if world.n_gems != world.gems_collected:
         raise AssertionError("Your is_goal_state method is likely erroneous beacuse some gems have not been collected")
+
+
+def test_optimal_with_spanning_tree():
+    world = World(
+        """
+        S0 . G .
+        .  @ . G
+        G  . . X"""
+    )
+    expected = bfs(GemSearchProblem(world))
+    problem = GemSearchProblem(world)
+    assert problem.heuristic(problem.initial_state) <= expected.n_steps
+    solution = astar(problem)
+    assert solution.n_steps == expected.n_steps
+    check_world_done(problem, solution)
+
+
+def test_spanning_tree_memoized():
+    problem = GemSearchProblem(World.from_file("cartes/gems"))
+    astar(problem)
+    all_gems = problem.encoder.gems_mask
+    assert problem.spanning_tree(all_gems) == problem._spanning_trees[all_gems]
+    assert 1 < len(problem._spanning_trees) <= 2 ** len(problem.gems)
@@ -0,0 +1,44 @@
+import pytest
+from lle import World
+from cache import LRUCache
+from problem import CornerSearchProblem, GemSearchProblem
+from search import astar, ida_star
+
+
+def test_lru_eviction():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1, "evictions": 1, "hit_rate": 2 / 3}
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+
+def test_same_solutions_with_cache():
+    world = World.from_file("cartes/corners")
+    expected = astar(CornerSearchProblem(world))
+    problem = CornerSearchProblem(world, cache_size=100)
+    assert astar(problem).actions == expected.actions
+    assert len(problem.heuristic_cache) <= 100
+
+
+def test_hits_on_revisits():
+    world = World.from_file("cartes/2_agents/zigzag")
+    expected = ida_star(GemSearchProblem(world))
+    problem = GemSearchProblem(world, cache_size=10_000)
+    assert ida_star(problem).actions == expected.actions
+    assert problem.heuristic_cache.hits > problem.heuristic_cache.misses
+
+
+def test_swapped_agents_share_signature():
+    world = World.from_file("cartes/2_agents/vide")
+    problem = GemSearchProblem(world)
+    encoder = problem.encoder
+    cells, gems, _ = encoder.unpack(problem.initial_state.key)
+    swapped = problem.decode(encoder.pack(reversed(cells), gems))
+    assert problem.heuristic_signature(swapped) == problem.heuristic_signature(problem.initial_state)
@@ -0,0 +1,43 @@
+import pytest
+from lle import World
+from problem import GemSearchProblem, SimpleSearchProblem
+from search import bfs, independence_detection
+
+from .utils import check_world_done
+
+
+def test_same_length_as_bfs():
+    for map_file in ["cartes/1_agent/zigzag", "cartes/2_agents/vide", "cartes/2_agents/zigzag", "level3"]:
+        world = World.from_file(map_file)
+        expected = bfs(SimpleSearchProblem(world))
+        problem = SimpleSearchProblem(world)
+        solution = independence_detection(problem)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_conflicting_agents_are_merged():
+    # Both agents must cross the same corridor
+    world = World(
+        """
+        S0 . @ @ @ X
+        .  . . . . .
+        S1 . @ @ @ X"""
+    )
+    expected = bfs(SimpleSearchProblem(world))
+    problem = SimpleSearchProblem(world)
+    solution = independence_detection(problem)
+    assert solution.n_steps == expected.n_steps
+    check_world_done(problem, solution)
+
+
+def test_lasers():
+    world = World.from_file("level4")
+    problem = SimpleSearchProblem(world)
+    check_world_done(problem, independence_detection(problem))
+
+
+def test_impossible():
+    assert independence_detection(SimpleSearchProblem(World.from_file("cartes/2_agents/impossible"))) is None
+    with pytest.raises(ValueError):
+        independence_detection(GemSearchProblem(World.from_file("cartes/2_agents/vide")))
@@ -0,0 +1,35 @@
+from lle import World
+from instrumentation import SearchMonitor
+from problem import CornerSearchProblem, SimpleSearchProblem
+from search import search, Queue, Heap
+
+
+def test_same_solution_as_without_monitor():
+    world = World.from_file("cartes/corners")
+    for Frontier in (Queue, Heap):
+        expected_problem = CornerSearchProblem(world)
+        expected = search(expected_problem, Frontier)
+        problem = CornerSearchProblem(world)
+        monitor = SearchMonitor()
+        solution = search(problem, Frontier, monitor=monitor)
+        assert solution.actions == expected.actions
+        assert problem.nodes_expanded == expected_problem.nodes_expanded
+        # Every successor is either pruned or pushed, and the initial state is pushed without being a successor
+        assert monitor.successors_generated == problem.successors_generated == monitor.duplicates + monitor.pushed - 1
+        assert monitor.pushed >= monitor.popped == monitor.expanded + 1
+        assert monitor.max_frontier_size > 0
+        assert monitor.heuristic_time > 0 and monitor.successors_time > 0 and monitor.goal_test_time > 0
+
+
+def test_callbacks():
+    events = []
+    monitor = SearchMonitor(
+        on_pop=lambda node: events.append("pop"),
+        on_duplicate=lambda node, successor: events.append("duplicate"),
+        on_goal=lambda node: events.append(node.get_actions()),
+    )
+    world = World.from_file("cartes/1_agent/zigzag")
+    solution = search(SimpleSearchProblem(world), Heap, monitor=monitor)
+    assert events[-1] == solution.actions
+    assert events.count("pop") == monitor.popped
+    assert events.count("duplicate") == monitor.duplicates
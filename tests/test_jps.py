@@ -0,0 +1,39 @@
+from lle import World
+from problem import SimpleSearchProblem
+from search import astar, bfs, jps
+
+from .utils import check_world_done
+
+
+def test_same_length_as_bfs():
+    for map_file in ["cartes/1_agent/vide", "cartes/1_agent/zigzag"]:
+        world = World.from_file(map_file)
+        expected = bfs(SimpleSearchProblem(world))
+        problem = SimpleSearchProblem(world)
+        solution = jps(problem)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_expands_jump_points_only():
+    world = World.from_file("cartes/1_agent/vide")
+    expected = SimpleSearchProblem(world)
+    astar(expected)
+    problem = SimpleSearchProblem(world)
+    jps(problem)
+    assert problem.nodes_expanded < expected.nodes_expanded
+
+
+def test_falls_back_to_astar():
+    world = World.from_file("cartes/2_agents/zigzag")
+    expected = astar(SimpleSearchProblem(world))
+    problem = SimpleSearchProblem(world)
+    assert jps(problem).actions == expected.actions
+    world = World("S0 . L0S .\n.  . .   X")
+    problem = SimpleSearchProblem(world)
+    assert jps(problem).actions == astar(SimpleSearchProblem(world)).actions
+
+
+def test_impossible():
+    problem = SimpleSearchProblem(World.from_file("cartes/1_agent/impossible"))
+    assert jps(problem) is None
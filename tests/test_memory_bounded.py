@@ -0,0 +1,60 @@
+import pytest
+from lle import World
+from problem import GemSearchProblem
+from search import astar, ida_star, sma_star
+
+from .utils import check_world_done
+
+
+MAPS = ["cartes/1_agent/vide", "cartes/1_agent/zigzag", "cartes/2_agents/vide", "cartes/2_agents/zigzag"]
+
+
+def test_ida_star_same_length_as_astar():
+    for map_file in MAPS:
+        world = World.from_file(map_file)
+        expected = astar(GemSearchProblem(world))
+        problem = GemSearchProblem(world)
+        solution = ida_star(problem)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_sma_star_same_length_as_astar():
+    for map_file in MAPS:
+        world = World.from_file(map_file)
+        expected = astar(GemSearchProblem(world))
+        problem = GemSearchProblem(world)
+        solution = sma_star(problem, max_nodes=100)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_sma_star_budget_too_small():
+    # The plan of zigzag has 19 steps, so its path alone needs 20 nodes
+    world = World.from_file("cartes/1_agent/zigzag")
+    assert sma_star(GemSearchProblem(world), max_nodes=19) is None
+    assert sma_star(GemSearchProblem(world), max_nodes=20).n_steps == 19
+    with pytest.raises(ValueError):
+        sma_star(GemSearchProblem(world), max_nodes=0)
+
+
+def test_ida_star_budget():
+    world = World.from_file("cartes/1_agent/zigzag")
+    problem = GemSearchProblem(world)
+    assert ida_star(problem, max_nodes=5) is None
+    assert problem.nodes_expanded == 5
+    assert ida_star(GemSearchProblem(world), max_nodes=100_000).n_steps == 19
+
+
+def test_small_table():
+    for map_file in MAPS:
+        world = World.from_file(map_file)
+        expected = astar(GemSearchProblem(world))
+        assert ida_star(GemSearchProblem(world), table_size=10).n_steps == expected.n_steps
+        assert sma_star(GemSearchProblem(world), max_nodes=100, table_size=10).n_steps == expected.n_steps
+
+
+def test_impossible():
+    world = World.from_file("cartes/2_agents/impossible")
+    assert ida_star(GemSearchProblem(world)) is None
+    assert sma_star(GemSearchProblem(world), max_nodes=100) is None
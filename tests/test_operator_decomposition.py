@@ -0,0 +1,57 @@
+import pytest
+from lle import World
+from problem import GemSearchProblem, SimpleSearchProblem
+from search import astar, od_astar
+
+from .utils import check_world_done
+
+
+def test_same_length_as_astar():
+    for map_file in ["cartes/1_agent/zigzag", "cartes/2_agents/vide", "cartes/2_agents/zigzag", "level3"]:
+        world = World.from_file(map_file)
+        expected = astar(GemSearchProblem(world))
+        problem = GemSearchProblem(world)
+        solution = od_astar(problem)
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_fewer_successors_with_three_agents():
+    world = World(
+        """
+        S0 .  . .  . X
+        .  S2 . .  . .
+        .  .  @ S1 . .
+        .  .  . @  . .
+        .  .  . .  . .
+        X  .  . .  . X"""
+    )
+    expected = GemSearchProblem(world)
+    expected_solution = astar(expected)
+    problem = GemSearchProblem(world)
+    solution = od_astar(problem)
+    assert solution.n_steps == expected_solution.n_steps
+    check_world_done(problem, solution)
+    assert problem.successors_generated < expected.successors_generated
+
+
+def test_impossible():
+    problem = GemSearchProblem(World.from_file("cartes/2_agents/impossible"))
+    assert od_astar(problem) is None
+    assert problem.nodes_expanded > 0
+
+
+def test_simple_problem_rejected():
+    # Arriving on an exit is rewarded, so a step may cost 0 or -1 and the bound of the intermediate nodes would be wrong
+    world = World(
+        """
+        . S0 . . .
+        X X  . . .
+        . .  S1 . .
+        . .  . . ."""
+    )
+    with pytest.raises(ValueError):
+        od_astar(SimpleSearchProblem(world))
+    for map_file in ["cartes/2_agents/zigzag", "cartes/2_agents/vide"]:
+        with pytest.raises(ValueError):
+            od_astar(SimpleSearchProblem(World.from_file(map_file)))
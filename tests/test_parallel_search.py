@@ -0,0 +1,27 @@
+import pytest
+from lle import World
+from problem import SimpleSearchProblem, GemSearchProblem
+from search import astar
+from parallel_search import hda_star
+
+from .utils import check_world_done
+
+
+def test_optimal():
+    expected = astar(GemSearchProblem(World.from_file("cartes/gems")))
+    for n_workers in [1, 2, 3]:
+        result = hda_star("cartes/gems", "gems", n_workers=n_workers)
+        assert result.solution.n_steps == expected.n_steps
+        assert result.nodes_expanded > 0
+        check_world_done(GemSearchProblem(World.from_file("cartes/gems")), result.solution)
+
+
+def test_problem_options():
+    result = hda_star("level3", "simple", n_workers=2, native=True)
+    check_world_done(SimpleSearchProblem(World.from_file("level3")), result.solution)
+
+
+def test_impossible():
+    assert hda_star("cartes/2_agents/impossible", "simple", n_workers=2) is None
+    with pytest.raises(ValueError):
+        hda_star("cartes/gems", "maze")
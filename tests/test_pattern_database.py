@@ -0,0 +1,55 @@
+import os
+from lle import World
+from pattern_database import pattern_size, MAX_ENTRIES
+from problem import CornerSearchProblem, GemSearchProblem
+from search import astar, bfs
+
+from .utils import check_world_done
+
+
+WORLD = """
+S0 . G .
+.  @ . G
+G  . . X"""
+
+
+def test_exact_for_one_agent(tmp_path):
+    world = World(WORLD)
+    expected = bfs(GemSearchProblem(world))
+    problem = GemSearchProblem(world, patterns=str(tmp_path))
+    assert len(problem.patterns) == 1
+    assert problem.heuristic(problem.initial_state) == expected.n_steps
+    solution = astar(problem)
+    assert solution.n_steps == expected.n_steps
+    check_world_done(problem, solution)
+
+
+def test_built_once(tmp_path):
+    world = World(WORLD)
+    GemSearchProblem(world, patterns=str(tmp_path))
+    files = os.listdir(tmp_path)
+    mtimes = [os.path.getmtime(tmp_path / file) for file in files]
+    problem = GemSearchProblem(world, patterns=str(tmp_path))
+    assert os.listdir(tmp_path) == files
+    assert [os.path.getmtime(tmp_path / file) for file in files] == mtimes
+    assert problem.patterns[0].path == str(tmp_path / files[0])
+
+
+def test_two_agents(tmp_path):
+    world = World(
+        """
+        S0 . . .
+        .  . . .
+        S1 . X X"""
+    )
+    expected = bfs(CornerSearchProblem(world))
+    problem = CornerSearchProblem(world, patterns=str(tmp_path))
+    assert problem.heuristic(problem.initial_state) <= expected.n_steps
+    check_world_done(problem, astar(problem))
+
+
+def test_pattern_size():
+    assert pattern_size(36, 1, 25) == 6
+    assert pattern_size(36, 2, 3) == 3
+    assert 36**3 << pattern_size(36, 3, 25) <= MAX_ENTRIES
+    assert pattern_size(100, 4, 25) == 0
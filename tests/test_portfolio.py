@@ -0,0 +1,32 @@
+import pytest
+from lle import World
+from portfolio import solve
+from problem import SimpleSearchProblem
+
+from .utils import check_world_done
+
+
+def test_first_solution():
+    result = solve("cartes/1_agent/zigzag")
+    assert result is not None
+    check_world_done(SimpleSearchProblem(World.from_file("cartes/1_agent/zigzag")), result.solution)
+
+
+def test_best_within_deadline():
+    result = solve("cartes/2_agents/zigzag", algorithms=["dfs", "bfs", "astar"], deadline=30)
+    assert result.solution.n_steps == 12
+    check_world_done(SimpleSearchProblem(World.from_file("cartes/2_agents/zigzag")), result.solution)
+
+
+def test_algorithms_generator():
+    result = solve("cartes/1_agent/zigzag", algorithms=(algorithm for algorithm in ["bfs", "astar"]), deadline=30)
+    assert result.solution.n_steps == 19
+
+
+def test_impossible():
+    assert solve("cartes/1_agent/impossible", algorithms=["bfs", "astar"]) is None
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        solve("cartes/1_agent/zigzag", algorithms=["astar", "greedy"])
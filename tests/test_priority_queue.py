@@ -0,0 +1,80 @@
+import random
+from priority_queue import IndexedPriorityQueue, BucketQueue
+
+
+def test_pop_order():
+    queue = IndexedPriorityQueue()
+    for item, priority in [("a", 3), ("b", 1), ("c", 2)]:
+        queue.push(item, priority)
+    assert [queue.pop() for _ in range(3)] == ["b", "c", "a"]
+    assert queue.is_empty()
+
+
+def test_ties_are_fifo():
+    queue = IndexedPriorityQueue()
+    for item in range(5):
+        queue.push(item, 0)
+    assert [queue.pop() for _ in range(5)] == list(range(5))
+
+
+def test_update_only_decreases():
+    queue = IndexedPriorityQueue()
+    queue.push("a", 5)
+    queue.push("b", 3)
+    queue.update("a", 10)
+    assert queue.priority("a") == 5
+    queue.update("a", 1)
+    assert queue.pop() == "a"
+    queue.update("c", 0)
+    assert "c" in queue
+    assert queue.pop() == "c"
+
+
+def test_remove():
+    queue = IndexedPriorityQueue()
+    for item in range(10):
+        queue.push(item, item)
+    queue.remove(0)
+    queue.remove(5)
+    assert 5 not in queue
+    assert [queue.pop() for _ in range(len(queue))] == [1, 2, 3, 4, 6, 7, 8, 9]
+
+
+def test_random_operations():
+    rng = random.Random(0)
+    queue = IndexedPriorityQueue()
+    reference = {}
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.5:
+            item, priority = rng.randrange(200), rng.randrange(100)
+            queue.push(item, priority)
+            reference[item] = priority
+        elif op < 0.7 and reference:
+            item, priority = rng.choice(list(reference)), rng.randrange(100)
+            queue.update(item, priority)
+            reference[item] = min(reference[item], priority)
+        elif op < 0.8 and reference:
+            item = rng.choice(list(reference))
+            queue.remove(item)
+            del reference[item]
+        elif reference:
+            priority, item = queue.pop_with_priority()
+            assert priority == min(reference.values()) == reference.pop(item)
+        assert len(queue) == len(reference)
+
+
+def test_bucket_queue_order():
+    queue = BucketQueue()
+    for item, (priority, tie) in enumerate([(5, 1), (3, 0), (3, 2), (7, 0), (3, 2)]):
+        queue.push(item, priority, tie)
+    assert [queue.pop() for _ in range(5)] == [2, 4, 1, 0, 3]
+
+
+def test_bucket_queue_low_ties():
+    queue = BucketQueue(tie_breaking="low")
+    for item, tie in enumerate([2, 0, 1]):
+        queue.push(item, 4, tie)
+    queue.push("first", 1)
+    assert [queue.pop() for _ in range(4)] == ["first", 1, 2, 0]
+    assert queue.is_empty()
@@ -0,0 +1,51 @@
+import pytest
+from lle import World
+from problem import SimpleSearchProblem, CornerSearchProblem
+from replanning import DStarLite
+from search import bfs
+
+from .utils import check_world_done
+
+
+def test_same_length_as_bfs():
+    for map_file in ["cartes/1_agent/zigzag", "cartes/2_agents/vide", "cartes/2_agents/zigzag", "level3"]:
+        world = World.from_file(map_file)
+        expected = bfs(SimpleSearchProblem(world))
+        problem = SimpleSearchProblem(world)
+        solution = DStarLite(problem).plan()
+        assert solution.n_steps == expected.n_steps
+        check_world_done(problem, solution)
+
+
+def test_impossible():
+    problem = SimpleSearchProblem(World.from_file("cartes/2_agents/impossible"))
+    assert DStarLite(problem).plan() is None
+    with pytest.raises(ValueError):
+        DStarLite(CornerSearchProblem(World.from_file("cartes/corners")))
+
+
+def test_wall_added():
+    problem = SimpleSearchProblem(World("S0 . . . X\n.  @ @ @ .\n.  . . . ."))
+    planner = DStarLite(problem)
+    assert planner.plan().n_steps == 4
+    changed = World("S0 . @ . X\n.  @ @ @ .\n.  . . . .")
+    planner.change_world(changed)
+    solution = planner.plan()
+    assert solution.n_steps == bfs(SimpleSearchProblem(changed)).n_steps == 8
+    check_world_done(SimpleSearchProblem(changed), solution)
+    planner.change_world(World("S0 . . . X\n.  @ @ @ .\n.  . . . ."))
+    assert planner.plan().n_steps == 4
+
+
+def test_cheaper_than_from_scratch():
+    world = World.from_file("level3")
+    problem = SimpleSearchProblem(world)
+    planner = DStarLite(problem)
+    solution = planner.plan()
+    first = problem.nodes_expanded
+    world.reset()
+    for action in solution.actions[:3]:
+        world.step(action)
+    planner.move_to(world.get_state())
+    assert planner.plan().n_steps == solution.n_steps - 3
+    assert problem.nodes_expanded - first < first
@@ -0,0 +1,53 @@
+from lle import World
+from problem import SimpleSearchProblem, GemSearchProblem
+from search import bfs, astar
+from solution_cache import SolutionCache
+from solve import run_job
+
+from .utils import check_world_done
+
+
+def test_hit_replays_without_search(tmp_path):
+    cache = SolutionCache(str(tmp_path / "solutions.sqlite"))
+    map_file = "cartes/2_agents/zigzag"
+    first = cache.solve(map_file, SimpleSearchProblem(World.from_file(map_file)), "bfs", bfs)
+    assert not first.hit
+    problem = SimpleSearchProblem(World.from_file(map_file))
+    second = cache.solve(map_file, problem, "bfs", bfs)
+    assert second.hit
+    assert second.solution.actions == first.solution.actions
+    assert (second.nodes_expanded, second.successors_generated) == (first.nodes_expanded, first.successors_generated)
+    assert problem.nodes_expanded == 0
+    check_world_done(problem, second.solution)
+    assert cache.get(map_file, problem, "astar") is None
+    assert cache.get(map_file, GemSearchProblem(World.from_file(map_file)), "bfs") is None
+
+
+def test_keyed_by_contents(tmp_path):
+    cache = SolutionCache(str(tmp_path / "solutions.sqlite"))
+    map_file = tmp_path / "map"
+    map_file.write_text("S0 . X")
+    cache.solve(str(map_file), SimpleSearchProblem(World.from_file(str(map_file))), "astar", astar)
+    map_file.write_text("S0 . . X")
+    result = cache.solve(str(map_file), SimpleSearchProblem(World.from_file(str(map_file))), "astar", astar)
+    assert not result.hit
+    assert result.solution.n_steps == 3
+
+
+def test_invalid_entry_dropped(tmp_path):
+    cache = SolutionCache(str(tmp_path / "solutions.sqlite"))
+    map_file = "cartes/1_agent/zigzag"
+    cache.solve(map_file, SimpleSearchProblem(World.from_file(map_file)), "bfs", bfs)
+    cache._db.execute("UPDATE solutions SET actions = '[[0]]'")
+    assert cache.get(map_file, SimpleSearchProblem(World.from_file(map_file)), "bfs") is None
+    assert cache._db.execute("SELECT COUNT(*) FROM solutions").fetchone() == (0,)
+
+
+def test_run_job_cached(tmp_path):
+    path = str(tmp_path / "solutions.sqlite")
+    first = run_job("cartes/1_agent/zigzag", "simple", "astar", cache=path)
+    second = run_job("cartes/1_agent/zigzag", "simple", "astar", cache=path)
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["steps"] == first["steps"]
+    assert second["nodes_expanded"] == first["nodes_expanded"] > 0
+    assert "cached" not in run_job("cartes/1_agent/zigzag", "simple", "astar")
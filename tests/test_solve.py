@@ -0,0 +1,37 @@
+import json
+from solve import expand_maps, run_job, main
+
+
+def test_expand_maps():
+    assert expand_maps(["cartes/1_agent/*", "level3"]) == [
+        "cartes/1_agent/impossible",
+        "cartes/1_agent/vide",
+        "cartes/1_agent/zigzag",
+        "level3",
+    ]
+    assert "cartes/2_agents/zigzag" in expand_maps(["cartes/**"])
+    # The pictures of the levels are not maps, the lle levels are
+    assert expand_maps(["level*"]) == ["level1", "level2", "level3", "level4", "level5", "level6"]
+    assert expand_maps(["level[12]", "level3", "cartes/nothing*"]) == ["level1", "level2", "level3", "cartes/nothing*"]
+
+
+def test_run_job():
+    result = run_job("cartes/1_agent/zigzag", "simple", "astar")
+    assert result["status"] == "solved"
+    assert result["steps"] == 19
+    assert result["nodes_expanded"] > 0
+    assert run_job("cartes/1_agent/impossible", "simple", "bfs")["status"] == "no_solution"
+
+
+def test_timeout():
+    result = run_job("level3", "corners", "bfs", timeout=0.01)
+    assert result["status"] == "timeout"
+    assert result["steps"] is None
+
+
+def test_main(tmp_path):
+    output = tmp_path / "results.jsonl"
+    main(["cartes/1_agent/vide", "cartes/2_agents/vide", "--algorithms", "bfs", "astar", "--workers", "2", "--output", str(output)])
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(results) == 4
+    assert all(result["status"] == "solved" and result["steps"] == 8 for result in results)